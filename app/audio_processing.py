@@ -0,0 +1,137 @@
+"""Audio helpers built on the ffmpeg/ffprobe command line tools (optional system dependency)."""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+from typing import BinaryIO, List, Optional, Tuple
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+_SILENCE_START_PATTERN = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END_PATTERN = re.compile(r"silence_end: (-?[\d.]+)")
+
+class AudioProcessingError(Exception):
+    """Raised when an ffmpeg/ffprobe command fails."""
+
+def ffmpeg_available() -> bool:
+    """Returns True if both ffmpeg and ffprobe are on the PATH."""
+    return bool(shutil.which("ffmpeg") and shutil.which("ffprobe"))
+
+async def _run_command(*args: str) -> Tuple[bytes, bytes]:
+    """Runs a command without blocking the event loop and returns (stdout, stderr)."""
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise AudioProcessingError(f"{args[0]} exited with code {process.returncode}: {stderr.decode(errors='replace')[-500:]}")
+    return stdout, stderr
+
+def get_file_size(audio_file: BinaryIO) -> int:
+    """Returns the size in bytes of a file object without changing its position."""
+    position = audio_file.tell()
+    audio_file.seek(0, os.SEEK_END)
+    size = audio_file.tell()
+    audio_file.seek(position)
+    return size
+
+async def save_to_path(audio_file: BinaryIO, path: str):
+    """Copies an audio file object to a path on disk (ffmpeg needs a real file)."""
+    def copy():
+        audio_file.seek(0)
+        with open(path, "wb") as output:
+            shutil.copyfileobj(audio_file, output)
+        audio_file.seek(0)
+    await asyncio.to_thread(copy)
+
+async def probe_duration(path: str) -> Optional[float]:
+    """Returns the audio duration in seconds, or None if it can't be determined."""
+    try:
+        stdout, _ = await _run_command(
+            "ffprobe", "-v", "error", "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1", path,
+        )
+        return float(stdout.decode().strip())
+    except (AudioProcessingError, ValueError) as e:
+        logger.warning(f"Could not determine duration of {path}: {e}")
+        return None
+
+async def detect_silences(path: str) -> List[Tuple[float, float]]:
+    """Returns (start, end) pairs of the silent stretches in the audio."""
+    _, stderr = await _run_command(
+        "ffmpeg", "-hide_banner", "-nostats", "-i", path,
+        "-af", f"silencedetect=noise={config.AUDIO_SILENCE_NOISE_DB}dB:d={config.AUDIO_SILENCE_MIN_SECONDS}",
+        "-f", "null", "-",
+    )
+    output = stderr.decode(errors="replace")
+    starts = [float(value) for value in _SILENCE_START_PATTERN.findall(output)]
+    ends = [float(value) for value in _SILENCE_END_PATTERN.findall(output)]
+    return list(zip(starts, ends))
+
+def choose_split_points(
+    duration: float,
+    silences: List[Tuple[float, float]],
+    target_chunk_seconds: float,
+    max_chunk_seconds: float,
+) -> List[float]:
+    """
+    Picks the timestamps at which to cut the audio into chunks.
+
+    Each cut is placed in the middle of the silence closest to `target_chunk_seconds` after the
+    previous cut, as long as the chunk stays under `max_chunk_seconds`. If no silence falls in
+    that window, the audio is cut hard at `max_chunk_seconds`.
+    """
+    silence_midpoints = [(start + end) / 2 for start, end in silences]
+    split_points: List[float] = []
+    chunk_start = 0.0
+    while duration - chunk_start > max_chunk_seconds:
+        window_start = chunk_start + target_chunk_seconds / 2
+        window_end = chunk_start + max_chunk_seconds
+        candidates = [point for point in silence_midpoints if window_start <= point <= window_end]
+        if candidates:
+            split_point = min(candidates, key=lambda point: abs(point - (chunk_start + target_chunk_seconds)))
+        else:
+            split_point = window_end
+        split_points.append(split_point)
+        chunk_start = split_point
+    return split_points
+
+async def extract_segment(input_path: str, output_path: str, start: float, end: Optional[float]):
+    """Writes the [start, end) segment of the input as compact mono speech audio."""
+    args = ["ffmpeg", "-hide_banner", "-nostats", "-y", "-ss", f"{start:.3f}"]
+    if end is not None:
+        args += ["-to", f"{end:.3f}"]
+    args += ["-i", input_path, *config.AUDIO_SPEECH_ENCODING_ARGS, output_path]
+    await _run_command(*args)
+
+async def plan_chunks(input_path: str) -> List[Tuple[float, Optional[float]]]:
+    """
+    Plans how to split an audio file into chunks at silence boundaries.
+
+    Returns:
+        (start, end) pairs in playback order; the last chunk's end is None (end of file).
+        A single (0.0, None) chunk if the audio is short enough not to need splitting.
+    """
+    duration = await probe_duration(input_path)
+    if duration is None or duration <= config.TRANSCRIPTION_CHUNK_MAX_SECONDS:
+        return [(0.0, None)]
+
+    silences = await detect_silences(input_path)
+    split_points = choose_split_points(
+        duration, silences, config.TRANSCRIPTION_CHUNK_TARGET_SECONDS, config.TRANSCRIPTION_CHUNK_MAX_SECONDS
+    )
+    starts = [0.0, *split_points]
+    ends: List[Optional[float]] = [*split_points, None]
+    logger.info(f"Splitting {duration:.0f}s of audio into {len(starts)} chunks ({len(silences)} silences detected).")
+    return list(zip(starts, ends))
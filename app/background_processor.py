@@ -1,20 +1,412 @@
 import logging
 import asyncio # Added for sleep
-import os      # Added for screenshot file handling
 import time    # Added for timestamp in filename
-from typing import Dict, Any
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set, Tuple
 
 from . import slack_handler
-from . import openai_handler
 from . import playwright_handler
+from . import browser_health
+from . import retry_policy
+from . import transcription_cache
+from . import transcription_engines
+from . import screenshot_processing
 from . import config # Needed for checks like openai_client presence
 
 logger = logging.getLogger(__name__)
 
 # --- Configuration for Screenshots ---
-SCREENSHOT_DIR = "tmp/screenshots"
 SCREENSHOT_ENABLED = True # Set to False to disable screenshots globally
 
+# Detached answer mirroring and screenshot tasks (see _start_follow_up)
+_follow_up_tasks: Set[asyncio.Task] = set()
+
+# --- Per-Service Submission Settings ---
+SERVICE_DISPLAY_NAMES = {
+    "chatgpt": "ChatGPT",
+    "claude": "Claude",
+    "gemini": "Gemini",
+}
+
+# Each submitter takes (page, prompt_text) and returns the new chat URL or None.
+# TODO: Potentially parse user_text for flags like !model=gpt-4o, !search=on or !extended=on
+SERVICE_SUBMITTERS: Dict[str, Callable[[Any, str], Awaitable[Optional[str]]]] = {
+    "chatgpt": lambda page, prompt: playwright_handler.submit_prompt_chatgpt(page, prompt, **config.SERVICE_COMPOSER_OPTIONS["chatgpt"]),
+    "claude": lambda page, prompt: playwright_handler.submit_prompt_claude(page, prompt, **config.SERVICE_COMPOSER_OPTIONS["claude"]),
+    "gemini": lambda page, prompt: playwright_handler.submit_prompt_gemini(page, prompt, **config.SERVICE_COMPOSER_OPTIONS["gemini"]),
+}
+
+async def _submit_to_service(
+    service_name: str,
+    prompt_text: str,
+    thread_ts: str,
+    results: Dict[str, Any],
+    leased_pages: Dict[str, Any],
+    deadline: float,
+):
+    """
+    Leases a tab for the service and submits the prompt with retries, recording its URL or error in results.
+
+    Failed attempts are retried with backoff while they are retryable and enough time is left
+    before `deadline` (event loop time); fatal failures are reported right away.
+    The leased tab is added to leased_pages so the caller can screenshot it and release it afterwards.
+    """
+    display_name = SERVICE_DISPLAY_NAMES[service_name]
+    submitter = SERVICE_SUBMITTERS[service_name]
+    if not browser_health.allow_request(service_name):
+        # The health monitor knows the browser is down; don't wait on timeouts to find out again
+        results[f'{service_name}_error'] = f"{display_name} browser is unavailable (reconnecting)."
+        logger.warning(f"{display_name} circuit is open. Skipping submission for event {thread_ts}")
+        return
+    # Record the tab in the same step it's leased (no await in between), so a cancellation at
+    # the deadline can't leave a leased tab that the caller doesn't know to release
+    page = await playwright_handler.lease_page(service_name)
+    if page:
+        leased_pages[service_name] = page
+    else:
+        results[f'{service_name}_error'] = f"{display_name} browser connection not available."
+        logger.warning(f"{display_name} page not found or not connected for event {thread_ts}")
+        return
+
+    logger.info(f"{display_name} page found. Attempting submission...")
+    service_url = None
+    failure = None
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            service_url = await submitter(page, prompt_text)
+            if service_url:
+                results[f'{service_name}_url'] = service_url
+                logger.info(f"{display_name} submission successful on attempt {attempts}, URL: {service_url}")
+                break # Exit loop on success
+            failure = "no chat URL returned"
+            error_class = retry_policy.RETRYABLE
+        except Exception as e:
+            failure = retry_policy.describe_error(e)
+            error_class = retry_policy.classify_error(e)
+        logger.warning(f"{display_name} submission attempt {attempts} failed ({error_class}): {failure}")
+
+        if error_class == retry_policy.FATAL:
+            break
+        if not browser_health.allow_request(service_name):
+            failure = "browser became unavailable"
+            break
+        delay = retry_policy.backoff_delay(attempts)
+        if not retry_policy.can_retry(attempts, delay, deadline):
+            break
+        logger.info(f"Retrying {display_name} in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+
+    browser_health.record_submission_result(service_name, bool(service_url))
+    if not service_url:
+        results[f'{service_name}_error'] = f"Failed to submit prompt to {display_name} after {attempts} attempt(s): {failure}."
+        logger.error(f"{display_name} submission failed after {attempts} attempt(s) for event {thread_ts}: {failure}")
+
+async def _submit_to_all_services(
+    prompt_text: str,
+    thread_ts: str,
+    results: Dict[str, Any],
+    leased_pages: Dict[str, Any],
+    on_service_done: Optional[Callable[[], Awaitable[None]]] = None,
+):
+    """
+    Submits the prompt to every configured service and waits for all of them, or the deadline.
+
+    In fan-out mode every service is driven concurrently, so the stage takes as long as the
+    slowest service. Otherwise services are submitted one after another. Services that have
+    not finished when SUBMISSION_DEADLINE_SECONDS passes are cancelled and reported as timed out.
+    `on_service_done` is awaited each time a service's URL or error has been recorded.
+    """
+    services = list(SERVICE_SUBMITTERS.keys())
+    deadline = retry_policy.new_deadline()
+
+    async def submit_and_report(service_name: str):
+        await _submit_to_service(service_name, prompt_text, thread_ts, results, leased_pages, deadline)
+        if on_service_done:
+            await on_service_done()
+
+    if config.SUBMISSION_FANOUT_ENABLED:
+        logger.info(f"Submitting to {', '.join(services)} concurrently for event {thread_ts}")
+        tasks = [asyncio.create_task(submit_and_report(service_name)) for service_name in services]
+    else:
+        async def submit_sequentially():
+            for service_name in services:
+                await submit_and_report(service_name)
+        logger.info(f"Submitting to {', '.join(services)} sequentially for event {thread_ts}")
+        tasks = [asyncio.create_task(submit_sequentially())]
+
+    start_time = time.time()
+    done, pending = await asyncio.wait(tasks, timeout=retry_policy.time_left(deadline))
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for task in done:
+        if not task.cancelled() and task.exception():
+            logger.error(f"Unexpected error in submission task for event {thread_ts}: {task.exception()}", exc_info=task.exception())
+
+    # Any service without a URL or an error at this point was cut off by the deadline
+    for service_name in services:
+        if not results.get(f'{service_name}_url') and not results.get(f'{service_name}_error'):
+            display_name = SERVICE_DISPLAY_NAMES[service_name]
+            results[f'{service_name}_error'] = f"{display_name} submission did not finish within {config.SUBMISSION_DEADLINE_SECONDS:.0f} seconds."
+            logger.error(f"{display_name} submission timed out for event {thread_ts}")
+
+    logger.info(f"Submission stage finished in {time.time() - start_time:.2f} seconds for event {thread_ts}")
+
+def _pending_steps(results: Dict[str, Any], transcribing: bool = False) -> List[str]:
+    """Names of the steps still running, for the summary's waiting line."""
+    pending = ["Transcript"] if transcribing else []
+    pending += [
+        SERVICE_DISPLAY_NAMES[service_name]
+        for service_name in SERVICE_SUBMITTERS
+        if not results.get(f'{service_name}_url') and not results.get(f'{service_name}_error')
+    ]
+    return pending
+
+def _format_mirrored_answer(service_name: str, text: str, complete: bool) -> str:
+    """Formats an answer for its Slack reply, cut to RESPONSE_MIRROR_MAX_CHARS."""
+    header = f"*{SERVICE_DISPLAY_NAMES[service_name]}*" + ("" if complete else " _(answering…)_")
+    if not text:
+        return f"{header}\n_No answer text found._"
+    # Answers are untrusted text: escape it so `<!channel>` or HTML in it isn't interpreted by Slack
+    if len(text) > config.RESPONSE_MIRROR_MAX_CHARS:
+        return f"{header}\n{slack_handler.escape_mrkdwn(text[:config.RESPONSE_MIRROR_MAX_CHARS].rstrip())}…\n_(continued in the chat)_"
+    return f"{header}\n{slack_handler.escape_mrkdwn(text)}"
+
+async def _mirror_service_response(
+    service_name: str,
+    channel_id: str,
+    thread_ts: str,
+    page: Any,
+    results: Dict[str, Any],
+):
+    """Mirrors one service's answer into its own thread reply while it is generated."""
+    message = slack_handler.MirroredMessage(channel_id, thread_ts, config.RESPONSE_MIRROR_UPDATE_INTERVAL_SECONDS)
+
+    async def on_update(text: str, complete: bool):
+        await message.update(_format_mirrored_answer(service_name, text, complete), final=complete)
+
+    try:
+        results[f'{service_name}_answer'] = await playwright_handler.watch_response(
+            page, service_name, on_update, config.RESPONSE_MIRROR_TIMEOUT_SECONDS
+        )
+    except Exception as e:
+        logger.error(f"Failed to mirror {service_name} answer for thread {thread_ts}: {e}", exc_info=True)
+
+def _screenshot_extension() -> str:
+    return "jpg" if config.SCREENSHOT_FORMAT == "jpeg" else "png"
+
+async def _capture_service_screenshot(
+    service_name: str,
+    thread_ts: str,
+    page: Any,
+) -> Optional[Tuple[str, bytes]]:
+    """Captures one service's tab and returns (filename, image bytes)."""
+    screenshot = await playwright_handler.capture_screenshot(service_name, page=page)
+    if screenshot is None:
+        return None
+
+    timestamp = time.strftime("%Y%m%d%H%M%S")
+    filename = f"{service_name}_{timestamp}_{thread_ts}.{_screenshot_extension()}"
+    return filename, screenshot
+
+async def _build_collage(
+    names: List[str],
+    screenshots: List[Tuple[str, bytes]],
+) -> Optional[bytes]:
+    """Combines the captured screenshots into one side-by-side image (None if that isn't possible)."""
+    labelled = [(name, content) for name, (_, content) in zip(names, screenshots)]
+    return await asyncio.to_thread(screenshot_processing.make_collage, labelled)
+
+async def _upload_screenshots(
+    channel_id: str,
+    thread_ts: str,
+    services: List[str],
+    captures: List[Optional[Tuple[str, bytes]]],
+):
+    """
+    Uploads the captured chats to the thread in one message, as a collage if enabled.
+
+    Captures stay in memory. Each is at most SCREENSHOT_MAX_HEIGHT_PX tall and, with Pillow,
+    SCREENSHOT_MAX_BYTES (see capture_screenshot), which bounds the memory held per message.
+    """
+    screenshots = [capture for capture in captures if capture]
+    if not screenshots:
+        logger.error(f"Every screenshot failed for thread {thread_ts}. Skipping upload.")
+        return
+
+    captured_names = [SERVICE_DISPLAY_NAMES[service_name] for service_name, capture in zip(services, captures) if capture]
+    if config.SCREENSHOT_COLLAGE_ENABLED and len(screenshots) > 1:
+        collage = await _build_collage(captured_names, screenshots)
+        if collage:
+            screenshots = [(f"answers_{thread_ts}.{_screenshot_extension()}", collage)]
+    upload_success = await slack_handler.upload_screenshots_to_thread(
+        channel_id=channel_id,
+        thread_ts=thread_ts,
+        screenshots=screenshots,
+        initial_comment=f"Screenshots: {', '.join(captured_names)}",
+    )
+    if not upload_success:
+        logger.error(f"Failed to upload screenshots for thread {thread_ts}.")
+
+    logger.info(f"Screenshot capture process completed for thread {thread_ts}")
+
+async def _follow_up_service(
+    service_name: str,
+    channel_id: str,
+    thread_ts: str,
+    page: Any,
+    results: Dict[str, Any],
+) -> Optional[Tuple[str, bytes]]:
+    """Mirrors one service's answer, then captures its tab. The tab is released as soon as this service is done."""
+    try:
+        if config.RESPONSE_MIRROR_ENABLED:
+            await _mirror_service_response(service_name, channel_id, thread_ts, page, results)
+        if SCREENSHOT_ENABLED:
+            return await _capture_service_screenshot(service_name, thread_ts, page)
+        return None
+    finally:
+        await playwright_handler.release_page(service_name, page)
+
+async def _follow_up(
+    channel_id: str,
+    thread_ts: str,
+    results: Dict[str, Any],
+    pages: Dict[str, Any],
+):
+    """Mirrors the answers of the successfully submitted services into the thread concurrently, then uploads their screenshots."""
+    services = list(pages)
+    try:
+        logger.info(f"Following up on {len(services)} answer(s) in thread {thread_ts}...")
+        captures = await asyncio.gather(*[
+            _follow_up_service(service_name, channel_id, thread_ts, pages[service_name], results)
+            for service_name in services
+        ])
+        if SCREENSHOT_ENABLED:
+            await _upload_screenshots(channel_id, thread_ts, services, captures)
+    except Exception as e:
+        logger.error(f"Follow-up for thread {thread_ts} failed: {e}", exc_info=True)
+
+def _start_follow_up(
+    channel_id: str,
+    thread_ts: str,
+    results: Dict[str, Any],
+    pages: Dict[str, Any],
+):
+    """
+    Runs answer mirroring and screenshots in a detached task that owns (and releases) the given tabs.
+
+    Following an answer can take minutes; doing it outside the job frees the queue worker for
+    the next message as soon as the summary is posted.
+    """
+    task = asyncio.create_task(_follow_up(channel_id, thread_ts, results, pages), name=f"follow-up-{thread_ts}")
+    _follow_up_tasks.add(task)
+    task.add_done_callback(_follow_up_tasks.discard)
+
+async def cancel_follow_ups():
+    """Cancels running follow-ups at shutdown; their tabs are released as they unwind."""
+    for task in list(_follow_up_tasks):
+        task.cancel()
+    await asyncio.gather(*_follow_up_tasks, return_exceptions=True)
+
+async def _transcribe_audio_file(
+    audio_file_info: slack_handler.AudioFileInfo,
+    thread_ts: str,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns (transcript, error) for a Slack audio attachment.
+
+    The transcription cache is checked by Slack file ID before downloading, and by content
+    hash after downloading, so re-shared or re-processed audio skips the Whisper call.
+    """
+    cached_transcript = await transcription_cache.get_by_file_id(audio_file_info.file_id)
+    if cached_transcript is not None:
+        logger.info(f"Using cached transcript for file {audio_file_info.file_id} (event {thread_ts})")
+        return cached_transcript, None
+
+    # The OpenAI engine needs an API key; the local engine needs faster-whisper installed
+    if not transcription_engines.any_engine_available():
+        logger.warning(f"Transcription skipped (no OpenAI key or local engine) for event {thread_ts}")
+        return None, "Audio detected, but transcription disabled (OpenAI API key missing)."
+
+    try:
+        audio_file = await slack_handler.download_slack_audio(audio_file_info.url)
+    except slack_handler.AudioTooLargeError:
+        logger.error(f"Audio file too large for event {thread_ts}")
+        return None, f"Audio file is larger than the {config.AUDIO_DOWNLOAD_MAX_BYTES // (1024 * 1024)} MB limit."
+    if not audio_file:
+        logger.error(f"Audio download failed for event {thread_ts}")
+        return None, "Failed to download audio file from Slack."
+
+    try:
+        content_hash = await transcription_cache.hash_audio_file(audio_file)
+        cached_transcript = await transcription_cache.get_by_hash(content_hash)
+        if cached_transcript is not None:
+            logger.info(f"Using cached transcript for audio content {content_hash[:12]} (event {thread_ts})")
+            await transcription_cache.store(content_hash, cached_transcript, audio_file_info.file_id)
+            return cached_transcript, None
+
+        engine = transcription_engines.select_engine(audio_file)
+        if engine is None:
+            return None, "Audio detected, but no transcription engine is available."
+        logger.info(f"Transcribing {audio_file_info.name} with the {engine.name} engine (event {thread_ts})")
+        transcript = await engine.transcribe(audio_file, audio_file_info.name, audio_file_info.mimetype)
+        if transcript is None:
+            # Transcription failed in the engine
+            logger.warning(f"Transcription failed for event {thread_ts}")
+            return None, f"Error during transcription with {engine.display_name}."
+
+        await transcription_cache.store(content_hash, transcript, audio_file_info.file_id)
+        return transcript, None
+    finally:
+        audio_file.close()
+
+async def _transcribe_audio_files(
+    audio_files_info: List[slack_handler.AudioFileInfo],
+    thread_ts: str,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Downloads and transcribes every audio attachment concurrently.
+
+    Returns (transcript, error). With several files, each transcript is labelled with its
+    file name and they are joined in attachment order; errors are listed per file.
+    """
+    semaphore = asyncio.Semaphore(config.AUDIO_FILES_CONCURRENCY)
+
+    async def transcribe_one(audio_file_info: slack_handler.AudioFileInfo) -> Tuple[Optional[str], Optional[str]]:
+        async with semaphore:
+            return await _transcribe_audio_file(audio_file_info, thread_ts)
+
+    if len(audio_files_info) == 1:
+        return await _transcribe_audio_file(audio_files_info[0], thread_ts)
+
+    logger.info(f"Transcribing {len(audio_files_info)} audio files concurrently for event {thread_ts}")
+    outcomes = await asyncio.gather(*(transcribe_one(audio_file_info) for audio_file_info in audio_files_info))
+
+    transcript_parts = []
+    error_parts = []
+    for audio_file_info, (transcript, error) in zip(audio_files_info, outcomes):
+        if transcript:
+            transcript_parts.append(f"[{audio_file_info.name}]\n{transcript}")
+        if error:
+            error_parts.append(f"{audio_file_info.name}: {error}")
+
+    combined_transcript = "\n\n".join(transcript_parts) or None
+    combined_error = " | ".join(error_parts) or None
+    return combined_transcript, combined_error
+
+async def _post_final_summary(
+    channel_id: str,
+    thread_ts: str,
+    results: Dict[str, Any],
+    summary: Optional[slack_handler.SummaryMessage],
+):
+    """Completes the progressive summary, or posts the summary in one go if progressive updates are off."""
+    if summary:
+        await summary.update(results, final=True)
+    else:
+        await slack_handler.post_summary_reply(channel_id, thread_ts, results)
+
 async def process_message_event(event: Dict[str, Any]):
     """Orchestrates the processing of a message event in the background."""
     channel_id = event.get("channel")
@@ -55,28 +447,18 @@ async def process_message_event(event: Dict[str, Any]):
     #     logger.error("BACKGROUND: Error occurred during screenshot attempt.", exc_info=e)
 
     # --- Transcription Logic ---
-    audio_file_info = slack_handler.extract_audio_file_info(files)
-
-    if audio_file_info:
-        audio_url, audio_filename, audio_mimetype = audio_file_info
-        audio_bytes = await slack_handler.download_slack_audio(audio_url)
-
-        if audio_bytes:
-            # Check if OpenAI client was initialized (implies API key was present)
-            if openai_handler.openai_client:
-                results['transcript'] = openai_handler.transcribe_audio(audio_bytes, audio_filename, audio_mimetype)
-                if results['transcript'] is None:
-                    # Transcription failed at OpenAI
-                    results['transcript_error'] = "Error during transcription with OpenAI API."
-                    logger.warning(f"Transcription failed for event {thread_ts}")
-            else:
-                # OpenAI client not available (no API key)
-                results['transcript_error'] = "Audio detected, but transcription disabled (OpenAI API key missing)."
-                logger.warning(f"Transcription skipped (no OpenAI key) for event {thread_ts}")
-        else:
-            # Download failed
-            results['transcript_error'] = "Failed to download audio file from Slack."
-            logger.error(f"Audio download failed for event {thread_ts}")
+    audio_files_info = slack_handler.extract_audio_files_info(files)
+
+    # Post the summary right away and fill it in as results arrive
+    summary: Optional[slack_handler.SummaryMessage] = None
+    if config.SLACK_PROGRESSIVE_SUMMARY_ENABLED:
+        summary = slack_handler.SummaryMessage(channel_id, thread_ts, config.SLACK_SUMMARY_UPDATE_INTERVAL_SECONDS)
+        await summary.update(results, _pending_steps(results, transcribing=bool(audio_files_info)))
+
+    if audio_files_info:
+        results['transcript'], results['transcript_error'] = await _transcribe_audio_files(audio_files_info, thread_ts)
+        if summary:
+            await summary.update(results, _pending_steps(results))
     else:
         logger.info("BACKGROUND: No audio file found or suitable for processing.")
 
@@ -102,168 +484,42 @@ async def process_message_event(event: Dict[str, Any]):
             # We won't send this error message to the AI, just log and post summary
             logger.warning(f"Transcription failed and no original text for event {thread_ts}. Skipping AI submission.")
             # Post summary with errors
-            slack_handler.post_summary_reply(channel_id, thread_ts, results)
+            await _post_final_summary(channel_id, thread_ts, results, summary)
             return
         else:
             logger.warning(f"No transcript or original text available for event {thread_ts}. Skipping AI submission.")
             # Still post summary with errors if any
-            slack_handler.post_summary_reply(channel_id, thread_ts, results)
+            await _post_final_summary(channel_id, thread_ts, results, summary)
             return
 
     logger.info(f"Using combined prompt text for AI submission: '{prompt_text[:100]}...'")
 
-    # --- Playwright Submission (ChatGPT) --- #
-    chatgpt_page = playwright_handler.get_page_for_service("chatgpt")
-    chatgpt_url = None # Initialize URL variable outside the loop
-    chatgpt_attempts = 0
-
-    if chatgpt_page:
-        logger.info("ChatGPT page found. Attempting submission...")
-        while chatgpt_attempts < 3 and not chatgpt_url:
-            chatgpt_attempts += 1
-            try:
-                # TODO: Potentially parse user_text for flags like !model=gpt-4o or !search=on
-                chatgpt_url = await playwright_handler.submit_prompt_chatgpt(chatgpt_page, prompt_text, model_suffix='gpt-4o', enable_search=True)
-                if chatgpt_url:
-                    results['chatgpt_url'] = chatgpt_url
-                    logger.info(f"ChatGPT submission successful on attempt {chatgpt_attempts}, URL: {chatgpt_url}")
-                    break # Exit loop on success
-                else:
-                    logger.warning(f"ChatGPT submission attempt {chatgpt_attempts} failed (no URL returned). Retrying...")
-            except Exception as e:
-                logger.error(f"ChatGPT submission attempt {chatgpt_attempts} failed with exception: {e}. Retrying...", exc_info=False) # Log exception but don't fill console
-
-            if chatgpt_attempts < 3:
-                await asyncio.sleep(2) # Wait 2 seconds before retrying
-
-        if not chatgpt_url:
-            results['chatgpt_error'] = f"Failed to submit prompt to ChatGPT after {chatgpt_attempts} attempts."
-            logger.error(f"ChatGPT submission failed after {chatgpt_attempts} attempts for event {thread_ts}")
-    else:
-        results['chatgpt_error'] = "ChatGPT browser connection not available."
-        logger.warning(f"ChatGPT page not found or not connected for event {thread_ts}")
-
-    # --- Playwright Submission (Claude) --- #
-    claude_page = playwright_handler.get_page_for_service("claude")
-    claude_url = None
-    claude_attempts = 0
-
-    if claude_page:
-        logger.info("Claude page found. Attempting submission...")
-        while claude_attempts < 3 and not claude_url:
-            claude_attempts += 1
-            try:
-                # TODO: Add logic to parse prompt_text for flags like !extended=on if needed
-                claude_url = await playwright_handler.submit_prompt_claude(claude_page, prompt_text, use_extended_thinking=True)
-                if claude_url:
-                    results['claude_url'] = claude_url
-                    logger.info(f"Claude submission successful on attempt {claude_attempts}, URL: {claude_url}")
-                    break
-                else:
-                    logger.warning(f"Claude submission attempt {claude_attempts} failed (no URL returned). Retrying...")
-            except Exception as e:
-                logger.error(f"Claude submission attempt {claude_attempts} failed with exception: {e}. Retrying...", exc_info=False)
-
-            if claude_attempts < 3:
-                await asyncio.sleep(2)
-
-        if not claude_url:
-            results['claude_error'] = f"Failed to submit prompt to Claude after {claude_attempts} attempts."
-            logger.error(f"Claude submission failed after {claude_attempts} attempts for event {thread_ts}")
-    else:
-        results['claude_error'] = "Claude browser connection not available."
-        logger.warning(f"Claude page not found or not connected for event {thread_ts}")
-
-    # --- Playwright Submission (Gemini) --- #
-    gemini_page = playwright_handler.get_page_for_service("gemini")
-    gemini_url = None
-    gemini_attempts = 0
-
-    if gemini_page:
-        logger.info("Gemini page found. Attempting submission...")
-        while gemini_attempts < 3 and not gemini_url:
-            gemini_attempts += 1
-            try:
-                # No extra flags for Gemini in this version
-                gemini_url = await playwright_handler.submit_prompt_gemini(gemini_page, prompt_text)
-                if gemini_url:
-                    results['gemini_url'] = gemini_url
-                    logger.info(f"Gemini submission successful on attempt {gemini_attempts}, URL: {gemini_url}")
-                    break
-                else:
-                    logger.warning(f"Gemini submission attempt {gemini_attempts} failed (no URL returned). Retrying...")
-            except Exception as e:
-                logger.error(f"Gemini submission attempt {gemini_attempts} failed with exception: {e}. Retrying...", exc_info=False)
-
-            if gemini_attempts < 3:
-                await asyncio.sleep(2)
-
-        if not gemini_url:
-            results['gemini_error'] = f"Failed to submit prompt to Gemini after {gemini_attempts} attempts."
-            logger.error(f"Gemini submission failed after {gemini_attempts} attempts for event {thread_ts}")
-    else:
-        results['gemini_error'] = "Gemini browser connection not available."
-        logger.warning(f"Gemini page not found or not connected for event {thread_ts}")
-
-    # --- Post Final Summary Reply --- #
-    slack_handler.post_summary_reply(channel_id, thread_ts, results)
-
-    # --- Screenshot Capture and Upload (E10.T4) --- #
-    if SCREENSHOT_ENABLED:
-        logger.info(f"Starting screenshot capture for successful submissions in thread {thread_ts}")
-        successful_services = {
-            "chatgpt": results.get('chatgpt_url'),
-            "claude": results.get('claude_url'),
-            "gemini": results.get('gemini_url')
-        }
-
-        # Ensure screenshot directory exists (should have been created by playwright handler, but check)
-        if not os.path.exists(SCREENSHOT_DIR):
-            try:
-                os.makedirs(SCREENSHOT_DIR)
-                logger.info(f"Created screenshot directory: {SCREENSHOT_DIR}")
-            except OSError as e:
-                logger.error(f"Could not create screenshot directory {SCREENSHOT_DIR}: {e}. Screenshots disabled for this run.")
-                return # Exit if we can't create the dir
-
-        for service_name, service_url in successful_services.items():
-            if service_url:
-                # Generate unique filename
-                timestamp = time.strftime("%Y%m%d%H%M%S")
-                screenshot_filename = f"{service_name}_{timestamp}_{thread_ts}.png"
-                screenshot_path = os.path.join(SCREENSHOT_DIR, screenshot_filename)
-
-                logger.info(f"Attempting to capture screenshot for {service_name}...")
-                screenshot_success = await playwright_handler.take_screenshot_for_service(
-                    service_name=service_name,
-                    output_path=screenshot_path
-                )
-
-                if screenshot_success:
-                    logger.info(f"Screenshot for {service_name} captured successfully to {screenshot_path}. Attempting upload...")
-                    initial_comment = f"Screenshot for {service_name.capitalize()}:"
-                    upload_success = await slack_handler.upload_screenshot_to_thread(
-                        channel_id=channel_id,
-                        thread_ts=thread_ts,
-                        file_path=screenshot_path,
-                        initial_comment=initial_comment
-                    )
-
-                    if upload_success:
-                        logger.info(f"Screenshot for {service_name} uploaded successfully.")
-                        # Clean up the temporary file
-                        try:
-                            os.remove(screenshot_path)
-                            logger.info(f"Deleted temporary screenshot file: {screenshot_path}")
-                        except OSError as e:
-                            logger.error(f"Failed to delete temporary screenshot file {screenshot_path}: {e}")
-                    else:
-                        logger.error(f"Failed to upload screenshot for {service_name} from {screenshot_path}. File may remain.")
-                else:
-                    logger.error(f"Failed to capture screenshot for {service_name}. Skipping upload.")
-            # else: service_url was None, so skip screenshot
-
-        logger.info(f"Screenshot capture process completed for thread {thread_ts}")
-
-    else:
-        logger.info("Screenshots are disabled globally.")
\ No newline at end of file
+    # --- Playwright Submissions (ChatGPT, Claude, Gemini) --- #
+    leased_pages: Dict[str, Any] = {}
+    try:
+        async def refresh_summary():
+            await summary.update(results, _pending_steps(results))
+
+        await _submit_to_all_services(prompt_text, thread_ts, results, leased_pages, refresh_summary if summary else None)
+
+        # --- Post Final Summary Reply --- #
+        await _post_final_summary(channel_id, thread_ts, results, summary)
+
+        # --- Mirror the answers and upload screenshots (E10.T4), detached from this job --- #
+        if config.RESPONSE_MIRROR_ENABLED or SCREENSHOT_ENABLED:
+            follow_up_pages = {
+                service_name: page for service_name, page in leased_pages.items() if results.get(f'{service_name}_url')
+            }
+            if follow_up_pages:
+                _start_follow_up(channel_id, thread_ts, results, follow_up_pages)
+                # The follow-up releases these tabs itself
+                for service_name in follow_up_pages:
+                    del leased_pages[service_name]
+            else:
+                logger.info(f"No successful submissions to follow up on in thread {thread_ts}")
+        else:
+            logger.info("Answer mirroring and screenshots are disabled.")
+    finally:
+        # Hand the tabs back so other messages can use them
+        for service_name, page in leased_pages.items():
+            await playwright_handler.release_page(service_name, page)
@@ -0,0 +1,208 @@
+"""Background health checks of the Chrome/CDP connections, with reconnects and a per-service circuit breaker."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from playwright.async_api import Browser
+
+from . import config, playwright_handler
+
+logger = logging.getLogger(__name__)
+
+# Circuit states
+CIRCUIT_CLOSED = "closed"  # Healthy: submissions go through
+CIRCUIT_OPEN = "open"      # Browser down: submissions fail fast until a probe succeeds
+
+class CircuitBreaker:
+    """
+    Tracks the health of one service's browser.
+
+    Opens after `failure_threshold` consecutive failures (or immediately when tripped). While
+    open, requests are refused; the health monitor probes again once the backoff has passed,
+    doubling the backoff after every failed probe up to `max_backoff_seconds`, and closes the
+    circuit on the first successful probe.
+    """
+
+    def __init__(self, service_name: str, failure_threshold: int, base_backoff_seconds: float, max_backoff_seconds: float):
+        self.service_name = service_name
+        self.failure_threshold = failure_threshold
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.backoff_seconds = base_backoff_seconds
+        self.retry_at = 0.0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        return self.state == CIRCUIT_CLOSED
+
+    def probe_due(self) -> bool:
+        """Returns True if the circuit is open and its backoff has passed."""
+        return self.state == CIRCUIT_OPEN and time.monotonic() >= self.retry_at
+
+    def record_success(self):
+        if self.state == CIRCUIT_OPEN:
+            logger.info(f"{self.service_name} browser is healthy again. Closing circuit.")
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.backoff_seconds = self.base_backoff_seconds
+
+    def record_failure(self, reason: str):
+        self.consecutive_failures += 1
+        if self.state == CIRCUIT_OPEN:
+            # A failed probe: wait longer before the next one
+            self.backoff_seconds = min(self.backoff_seconds * 2, self.max_backoff_seconds)
+            self.retry_at = time.monotonic() + self.backoff_seconds
+            logger.warning(f"{self.service_name} probe failed ({reason}). Next probe in {self.backoff_seconds:.0f}s.")
+        elif self.consecutive_failures >= self.failure_threshold:
+            self.trip(reason)
+
+    def trip(self, reason: str):
+        """Opens the circuit immediately."""
+        if self.state == CIRCUIT_OPEN:
+            return
+        self.state = CIRCUIT_OPEN
+        self.times_opened += 1
+        self.retry_at = time.monotonic() + self.backoff_seconds
+        logger.error(f"Opening circuit for {self.service_name}: {reason}. Submissions fail fast; probing again in {self.backoff_seconds:.0f}s.")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "retry_in_seconds": max(0.0, round(self.retry_at - time.monotonic(), 1)) if self.state == CIRCUIT_OPEN else 0.0,
+        }
+
+CIRCUITS: Dict[str, CircuitBreaker] = {
+    service_name: CircuitBreaker(
+        service_name,
+        config.BROWSER_CIRCUIT_FAILURE_THRESHOLD,
+        config.BROWSER_CIRCUIT_BASE_BACKOFF_SECONDS,
+        config.BROWSER_CIRCUIT_MAX_BACKOFF_SECONDS,
+    )
+    for service_name in config.AI_SERVICES
+}
+_monitor_task: Optional[asyncio.Task] = None
+
+_NOT_CONNECTED = "browser not connected"
+
+def allow_request(service_name: str) -> bool:
+    """Returns False while the service's circuit is open (its browser is known to be down)."""
+    circuit = CIRCUITS.get(service_name)
+    return circuit is None or circuit.allow_request()
+
+def record_submission_result(service_name: str, success: bool):
+    """
+    Feeds the outcome of a submission into the service's circuit.
+
+    Ignored while the circuit is open: submissions that started before it opened finish late,
+    and only the monitor's probes decide when the browser is back.
+    """
+    circuit = CIRCUITS.get(service_name)
+    if circuit is None or circuit.state == CIRCUIT_OPEN:
+        return
+    if success:
+        circuit.record_success()
+    else:
+        circuit.record_failure("submission failed")
+
+async def _ping_browser(browser: Browser) -> bool:
+    """Sends a CDP command at the browser level, which page navigations don't interfere with."""
+    session = await browser.new_browser_cdp_session()
+    try:
+        await session.send("Browser.getVersion")
+        return True
+    finally:
+        await session.detach()
+
+async def _endpoint_reachable(port: int) -> bool:
+    """Returns True if Chrome's remote debugging endpoint answers HTTP."""
+    try:
+        async with httpx.AsyncClient(timeout=config.BROWSER_HEALTH_CHECK_TIMEOUT_SECONDS) as client:
+            response = await client.get(f"http://localhost:{port}/json/version")
+            return response.status_code == 200
+    except httpx.HTTPError:
+        return False
+
+async def _reconnect(service_name: str) -> bool:
+    port = config.AI_SERVICES[service_name]["port"]
+    if not await _endpoint_reachable(port):
+        logger.info(f"{service_name} debugging endpoint on port {port} is not reachable yet.")
+        return False
+    logger.info(f"Reconnecting to {service_name}...")
+    await playwright_handler.disconnect_service(service_name)
+    return await playwright_handler.connect_service(service_name)
+
+async def _connection_answers(service_name: str) -> Optional[str]:
+    """Pings the service's existing connection. Returns None if it answers, else the reason it doesn't."""
+    browser = playwright_handler.PLAYWRIGHT_INSTANCES.get(service_name, {}).get("browser")
+    if not isinstance(browser, Browser) or not browser.is_connected():
+        return _NOT_CONNECTED
+    try:
+        async with asyncio.timeout(config.BROWSER_HEALTH_CHECK_TIMEOUT_SECONDS):
+            await _ping_browser(browser)
+        return None
+    except Exception as e:
+        return f"CDP ping failed: {e or type(e).__name__}"
+
+async def check_service(service_name: str):
+    """
+    Checks one service's connection, and probes it once its backoff has passed if its circuit is open.
+
+    A probe closes the circuit if the existing connection still answers (the failures were in
+    the chat UI, not the browser), leaving in-flight jobs' tabs alone. Only a connection that is
+    gone or doesn't answer is torn down and reconnected.
+    """
+    circuit = CIRCUITS[service_name]
+    if circuit.state == CIRCUIT_OPEN:
+        if not circuit.probe_due():
+            return
+        failure = await _connection_answers(service_name)
+        if failure is None or await _reconnect(service_name):
+            circuit.record_success()
+        else:
+            circuit.record_failure(f"{failure}; reconnect failed")
+        return
+
+    failure = await _connection_answers(service_name)
+    if failure is None:
+        circuit.record_success()
+    elif failure == _NOT_CONNECTED:
+        circuit.trip(failure)
+    else:
+        circuit.record_failure(failure)
+
+async def _monitor():
+    while True:
+        await asyncio.sleep(config.BROWSER_HEALTH_CHECK_INTERVAL_SECONDS)
+        for service_name in CIRCUITS:
+            try:
+                await check_service(service_name)
+            except Exception as e:
+                logger.error(f"Health check for {service_name} failed unexpectedly: {e}", exc_info=True)
+
+def start_health_monitor():
+    """Opens the circuits of services that failed to connect at startup and starts the periodic checks."""
+    global _monitor_task
+    for service_name, circuit in CIRCUITS.items():
+        if not playwright_handler.PLAYWRIGHT_INSTANCES.get(service_name, {}).get("browser"):
+            circuit.trip("not connected at startup")
+    _monitor_task = asyncio.create_task(_monitor(), name="browser-health-monitor")
+    logger.info(f"Browser health monitor started (every {config.BROWSER_HEALTH_CHECK_INTERVAL_SECONDS:.0f}s).")
+
+async def stop_health_monitor():
+    """Stops the periodic checks."""
+    global _monitor_task
+    if _monitor_task:
+        _monitor_task.cancel()
+        await asyncio.gather(_monitor_task, return_exceptions=True)
+        _monitor_task = None
+
+def get_health_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns each service's circuit state."""
+    return {service_name: circuit.stats() for service_name, circuit in CIRCUITS.items()}
@@ -11,6 +11,63 @@ SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET")
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = "whisper-1"
+OPENAI_TRANSCRIPTION_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TRANSCRIPTION_TIMEOUT_SECONDS", 300))
+OPENAI_HTTP_MAX_CONNECTIONS = 10
+
+# Shared Slack HTTP connection pool
+SLACK_HTTP_MAX_CONNECTIONS = 10
+SLACK_HTTP_KEEPALIVE_SECONDS = 60
+
+# Audio downloads from Slack
+AUDIO_DOWNLOAD_TIMEOUT_SECONDS = 30.0
+# Downloads are buffered in memory up to this size, then spooled to a temp file on disk
+AUDIO_DOWNLOAD_SPOOL_THRESHOLD_BYTES = 5 * 1024 * 1024
+AUDIO_DOWNLOAD_MAX_BYTES = int(os.getenv("AUDIO_DOWNLOAD_MAX_BYTES", 200 * 1024 * 1024))
+
+# Maximum number of audio attachments from one message downloaded and transcribed at once
+AUDIO_FILES_CONCURRENCY = int(os.getenv("AUDIO_FILES_CONCURRENCY", 3))
+
+# --- Transcription Engine Settings ---
+# "openai" (Whisper API), "local" (faster-whisper on CPU) or "auto" (short clips local, long recordings via API)
+TRANSCRIPTION_ENGINE = os.getenv("TRANSCRIPTION_ENGINE", "openai").lower()
+# In "auto" mode, audio files up to this size are transcribed locally
+LOCAL_TRANSCRIPTION_MAX_BYTES = int(os.getenv("LOCAL_TRANSCRIPTION_MAX_BYTES", 2 * 1024 * 1024))
+# Local transcription stops after this long (checked between segments, so it may overrun by one segment's decoding time)
+LOCAL_TRANSCRIPTION_TIMEOUT_SECONDS = float(os.getenv("LOCAL_TRANSCRIPTION_TIMEOUT_SECONDS", 600))
+# Model name (e.g. "base", "small") or path to a local CTranslate2 model directory
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "base")
+LOCAL_WHISPER_DOWNLOAD_ROOT = os.getenv("LOCAL_WHISPER_DOWNLOAD_ROOT", "tmp/whisper_models")
+# Set to true to never touch the network (model must already be in LOCAL_WHISPER_DOWNLOAD_ROOT or LOCAL_WHISPER_MODEL)
+LOCAL_WHISPER_OFFLINE = os.getenv("LOCAL_WHISPER_OFFLINE", "false").lower() == "true"
+LOCAL_WHISPER_COMPUTE_TYPE = "int8"
+LOCAL_WHISPER_CPU_THREADS = int(os.getenv("LOCAL_WHISPER_CPU_THREADS", 0)) # 0 = library default
+LOCAL_WHISPER_BEAM_SIZE = 5
+
+# --- Audio Preprocessing and Chunking Settings (require ffmpeg/ffprobe on the PATH) ---
+# Long recordings are split at silences and the chunks transcribed concurrently
+TRANSCRIPTION_CHUNKING_ENABLED = os.getenv("TRANSCRIPTION_CHUNKING_ENABLED", "true").lower() == "true"
+TRANSCRIPTION_CHUNK_TARGET_SECONDS = 300
+# Audio longer than this is split; a chunk is cut hard here if no silence is found
+TRANSCRIPTION_CHUNK_MAX_SECONDS = 420
+TRANSCRIPTION_CHUNK_CONCURRENCY = int(os.getenv("TRANSCRIPTION_CHUNK_CONCURRENCY", 4))
+OPENAI_MAX_UPLOAD_BYTES = 25 * 1024 * 1024 # Whisper API file size limit
+AUDIO_SILENCE_NOISE_DB = -30
+AUDIO_SILENCE_MIN_SECONDS = 0.5
+# Audio larger than this is transcoded to compact speech encoding before upload; smaller files are sent as-is
+AUDIO_TRANSCODE_ENABLED = os.getenv("AUDIO_TRANSCODE_ENABLED", "true").lower() == "true"
+AUDIO_TRANSCODE_MIN_BYTES = int(os.getenv("AUDIO_TRANSCODE_MIN_BYTES", 1024 * 1024))
+# Compact mono speech encoding used for transcoding and chunks (Whisper accepts Ogg/Opus)
+AUDIO_SPEECH_FORMAT = "ogg"
+AUDIO_SPEECH_MIMETYPE = "audio/ogg"
+AUDIO_SPEECH_ENCODING_ARGS = ["-vn", "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "32k"]
+
+# --- Transcription Cache Settings ---
+# Transcripts are cached by Slack file ID and audio content hash
+TRANSCRIPTION_CACHE_ENABLED = os.getenv("TRANSCRIPTION_CACHE_ENABLED", "true").lower() == "true"
+TRANSCRIPTION_CACHE_DIR = os.getenv("TRANSCRIPTION_CACHE_DIR", "tmp/transcription_cache")
+# Transcripts (and Slack file ID lookups) held in memory; older ones are read back from disk
+TRANSCRIPTION_CACHE_MEMORY_ENTRIES = 256
+TRANSCRIPTION_CACHE_MAX_DISK_BYTES = int(os.getenv("TRANSCRIPTION_CACHE_MAX_DISK_BYTES", 50 * 1024 * 1024))
 
 # Load Chrome Debugging Ports
 CHROME_DEBUG_PORTS = {
@@ -35,6 +92,115 @@ AI_SERVICES = {
     },
 }
 
+# --- Playwright Page Pool Settings ---
+# Number of tabs opened per service so overlapping messages don't share a tab
+PLAYWRIGHT_PAGES_PER_SERVICE = max(1, int(os.getenv("PLAYWRIGHT_PAGES_PER_SERVICE", 2)))
+# How long a submission waits for a free tab before giving up
+PLAYWRIGHT_PAGE_LEASE_TIMEOUT_SECONDS = float(os.getenv("PLAYWRIGHT_PAGE_LEASE_TIMEOUT_SECONDS", 120))
+# Prepare a fresh composer (new chat, model, toggles) on idle tabs in the background
+PLAYWRIGHT_WARM_COMPOSERS_ENABLED = os.getenv("PLAYWRIGHT_WARM_COMPOSERS_ENABLED", "true").lower() == "true"
+# Upper bound on preparing one tab; a tab that takes longer goes back to the pool unprepared
+PLAYWRIGHT_WARM_TIMEOUT_SECONDS = float(os.getenv("PLAYWRIGHT_WARM_TIMEOUT_SECONDS", 30))
+# Open new chats (and preselect the ChatGPT model) by navigating to their URL instead of clicking through the UI
+PLAYWRIGHT_URL_FAST_PATH_ENABLED = os.getenv("PLAYWRIGHT_URL_FAST_PATH_ENABLED", "true").lower() == "true"
+# Run composer steps (toggles, fill, submit) through an injected page script in one round trip each
+PLAYWRIGHT_PAGE_HELPERS_ENABLED = os.getenv("PLAYWRIGHT_PAGE_HELPERS_ENABLED", "true").lower() == "true"
+
+# --- Browser Health Settings ---
+# How often each service's CDP connection is pinged; a dead connection is reconnected automatically
+BROWSER_HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("BROWSER_HEALTH_CHECK_INTERVAL_SECONDS", 15))
+BROWSER_HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("BROWSER_HEALTH_CHECK_TIMEOUT_SECONDS", 5))
+# Consecutive failed pings/submissions before a service's submissions fail fast instead of waiting on timeouts
+BROWSER_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("BROWSER_CIRCUIT_FAILURE_THRESHOLD", 3))
+# Delay before the first reconnect attempt, doubling after each failed attempt up to the maximum
+BROWSER_CIRCUIT_BASE_BACKOFF_SECONDS = float(os.getenv("BROWSER_CIRCUIT_BASE_BACKOFF_SECONDS", 5))
+BROWSER_CIRCUIT_MAX_BACKOFF_SECONDS = float(os.getenv("BROWSER_CIRCUIT_MAX_BACKOFF_SECONDS", 120))
+
+# --- Slack Summary Settings ---
+# Post the results summary immediately and edit it in place as the transcript and each link arrive
+SLACK_PROGRESSIVE_SUMMARY_ENABLED = os.getenv("SLACK_PROGRESSIVE_SUMMARY_ENABLED", "true").lower() == "true"
+# Minimum time between edits of the summary; results arriving in between are sent together
+SLACK_SUMMARY_UPDATE_INTERVAL_SECONDS = float(os.getenv("SLACK_SUMMARY_UPDATE_INTERVAL_SECONDS", 1.5))
+# Budget for message edits (chat.update) across all threads. Slack allows about 50 a minute (Tier 3);
+# intermediate edits of mirrored answers are skipped when there's no room, final edits wait their turn
+SLACK_EDITS_PER_MINUTE = float(os.getenv("SLACK_EDITS_PER_MINUTE", 45))
+
+# --- Screenshot Settings ---
+# Only the latest answer is captured, as "jpeg" (lossy, SCREENSHOT_JPEG_QUALITY 1-100) or "png"
+SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT", "jpeg").lower()
+SCREENSHOT_JPEG_QUALITY = int(os.getenv("SCREENSHOT_JPEG_QUALITY", 70))
+# Answers taller than this are captured from the top down to this height
+SCREENSHOT_MAX_HEIGHT_PX = int(os.getenv("SCREENSHOT_MAX_HEIGHT_PX", 2000))
+# Larger captures are re-encoded at lower quality / smaller size (requires Pillow)
+SCREENSHOT_MAX_BYTES = int(os.getenv("SCREENSHOT_MAX_BYTES", 300 * 1024))
+# Upload one side-by-side image of all services instead of one image each (requires Pillow)
+SCREENSHOT_COLLAGE_ENABLED = os.getenv("SCREENSHOT_COLLAGE_ENABLED", "false").lower() == "true"
+SCREENSHOT_COLLAGE_MAX_HEIGHT_PX = int(os.getenv("SCREENSHOT_COLLAGE_MAX_HEIGHT_PX", 1600))
+
+# --- Response Mirroring Settings ---
+# Copy each service's answer into the Slack thread while it's generated, editing the reply in place
+RESPONSE_MIRROR_ENABLED = os.getenv("RESPONSE_MIRROR_ENABLED", "true").lower() == "true"
+# Minimum time between edits of a mirrored reply (Slack rate-limits chat.update)
+RESPONSE_MIRROR_UPDATE_INTERVAL_SECONDS = float(os.getenv("RESPONSE_MIRROR_UPDATE_INTERVAL_SECONDS", 3))
+# How long to follow an answer before posting what's there
+RESPONSE_MIRROR_TIMEOUT_SECONDS = float(os.getenv("RESPONSE_MIRROR_TIMEOUT_SECONDS", 600))
+# Stop following an answer if no text has appeared after this long (the submission likely didn't start a reply)
+RESPONSE_MIRROR_FIRST_TEXT_TIMEOUT_SECONDS = float(os.getenv("RESPONSE_MIRROR_FIRST_TEXT_TIMEOUT_SECONDS", 90))
+# Stop following an answer after this many failed reads of the tab in a row
+RESPONSE_MIRROR_MAX_FAILED_READS = int(os.getenv("RESPONSE_MIRROR_MAX_FAILED_READS", 5))
+# An answer counts as complete once generation stopped and its text hasn't changed for this long
+RESPONSE_COMPLETE_QUIET_SECONDS = float(os.getenv("RESPONSE_COMPLETE_QUIET_SECONDS", 3))
+# Longer answers are cut off in Slack with a pointer to the chat
+RESPONSE_MIRROR_MAX_CHARS = int(os.getenv("RESPONSE_MIRROR_MAX_CHARS", 3500))
+
+# --- Large Prompt Settings ---
+# Prompts this long are inserted in one operation instead of fill(): "insert_text" (CDP) or "paste" (synthetic paste event)
+PROMPT_FAST_INSERT_MIN_CHARS = int(os.getenv("PROMPT_FAST_INSERT_MIN_CHARS", 2000))
+PROMPT_FAST_INSERT_METHOD = os.getenv("PROMPT_FAST_INSERT_METHOD", "insert_text").lower()
+# Prompts this long are attached as a text file where the service has an upload input (0 disables)
+PROMPT_ATTACHMENT_MIN_CHARS = int(os.getenv("PROMPT_ATTACHMENT_MIN_CHARS", 100000))
+PROMPT_ATTACHMENT_FILENAME = os.getenv("PROMPT_ATTACHMENT_FILENAME", "prompt.txt")
+PROMPT_ATTACHMENT_INSTRUCTION = os.getenv(
+    "PROMPT_ATTACHMENT_INSTRUCTION",
+    f"My full message is in the attached file {PROMPT_ATTACHMENT_FILENAME}. Please read it and respond to it.",
+)
+
+# Composer settings applied to every submission (and to tabs prepared in advance)
+SERVICE_COMPOSER_OPTIONS = {
+    "chatgpt": {"model_suffix": "gpt-4o", "enable_search": True},
+    "claude": {"use_extended_thinking": True},
+    "gemini": {},
+}
+
+# --- Job Queue Settings ---
+# Slack events are persisted here and processed by a fixed number of workers
+JOB_QUEUE_DB_PATH = os.getenv("JOB_QUEUE_DB_PATH", "tmp/job_queue.sqlite3")
+JOB_QUEUE_WORKERS = max(1, int(os.getenv("JOB_QUEUE_WORKERS", 2)))
+# Jobs interrupted by a restart this many times are marked failed instead of retried
+JOB_QUEUE_MAX_ATTEMPTS = 2
+JOB_QUEUE_RETENTION_SECONDS = 7 * 24 * 60 * 60 # Finished jobs are deleted after a week
+
+# --- Event Deduplication Settings ---
+# Slack re-delivers events when the ack is slow; seen event IDs and message timestamps are remembered this long
+EVENT_DEDUP_TTL_SECONDS = float(os.getenv("EVENT_DEDUP_TTL_SECONDS", 60 * 60))
+EVENT_DEDUP_MAX_ENTRIES = 10000
+# Persist seen events so duplicates are still caught after a restart
+EVENT_DEDUP_PERSIST = os.getenv("EVENT_DEDUP_PERSIST", "true").lower() == "true"
+EVENT_DEDUP_DB_PATH = os.getenv("EVENT_DEDUP_DB_PATH", "tmp/seen_events.sqlite3")
+
+# --- AI Submission Settings ---
+# When enabled, prompts are submitted to all connected services concurrently
+# instead of one after another.
+SUBMISSION_FANOUT_ENABLED = os.getenv("SUBMISSION_FANOUT_ENABLED", "true").lower() == "true"
+SUBMISSION_MAX_ATTEMPTS = int(os.getenv("SUBMISSION_MAX_ATTEMPTS", 3))
+# Delay before the first retry, doubled after each further attempt up to the maximum, with random jitter
+SUBMISSION_RETRY_BASE_DELAY_SECONDS = float(os.getenv("SUBMISSION_RETRY_BASE_DELAY_SECONDS", 2))
+SUBMISSION_RETRY_MAX_DELAY_SECONDS = float(os.getenv("SUBMISSION_RETRY_MAX_DELAY_SECONDS", 15))
+# Overall time budget for the submission stage before the summary is posted anyway
+SUBMISSION_DEADLINE_SECONDS = float(os.getenv("SUBMISSION_DEADLINE_SECONDS", 240))
+# A retry is only started if at least this much of the deadline is left for it
+SUBMISSION_MIN_ATTEMPT_SECONDS = float(os.getenv("SUBMISSION_MIN_ATTEMPT_SECONDS", 20))
+
 # Log warnings if essential variables are missing
 if not SLACK_SIGNING_SECRET:
     logger.critical("SLACK_SIGNING_SECRET environment variable not set. Verification disabled.")
@@ -0,0 +1,158 @@
+"""Drops Slack events that were already scheduled (retries and repeated deliveries)."""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+class SeenEventCache:
+    """An in-memory set of keys that forgets entries after a TTL or when it grows past max_entries (LRU)."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[str, float]" = OrderedDict() # key -> time first seen
+
+    def contains(self, key: str) -> bool:
+        """Returns True if the key was seen within the TTL."""
+        seen_at = self._seen.get(key)
+        if seen_at is None:
+            return False
+        if time.time() - seen_at > self.ttl_seconds:
+            del self._seen[key]
+            return False
+        self._seen.move_to_end(key)
+        return True
+
+    def add(self, key: str, seen_at: Optional[float] = None):
+        """Records a key, evicting expired and least recently used entries as needed."""
+        self._seen[key] = seen_at if seen_at is not None else time.time()
+        self._seen.move_to_end(key)
+        self._evict()
+
+    def discard(self, key: str):
+        """Forgets a key if present."""
+        self._seen.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl_seconds
+        while self._seen:
+            oldest_key, oldest_seen_at = next(iter(self._seen.items()))
+            if len(self._seen) > self.max_entries or oldest_seen_at < cutoff:
+                del self._seen[oldest_key]
+            else:
+                break
+
+_seen_events = SeenEventCache(config.EVENT_DEDUP_TTL_SECONDS, config.EVENT_DEDUP_MAX_ENTRIES)
+_connection: Optional[sqlite3.Connection] = None
+_db_lock = threading.Lock()
+duplicates_dropped = 0
+
+def initialize_event_dedup():
+    """Opens the persisted seen-event store (if enabled) and loads keys still within the TTL."""
+    global _connection
+    if not config.EVENT_DEDUP_PERSIST:
+        logger.info("Event deduplication running in memory only.")
+        return
+
+    try:
+        db_dir = os.path.dirname(config.EVENT_DEDUP_DB_PATH)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        _connection = sqlite3.connect(config.EVENT_DEDUP_DB_PATH, check_same_thread=False)
+        with _connection:
+            _connection.execute("CREATE TABLE IF NOT EXISTS seen_events (key TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+            _connection.execute("DELETE FROM seen_events WHERE seen_at < ?", (time.time() - config.EVENT_DEDUP_TTL_SECONDS,))
+        rows = _connection.execute(
+            "SELECT key, seen_at FROM seen_events ORDER BY seen_at DESC LIMIT ?", (config.EVENT_DEDUP_MAX_ENTRIES,)
+        ).fetchall()
+        for key, seen_at in reversed(rows):
+            _seen_events.add(key, seen_at)
+        logger.info(f"Event deduplication initialized with {len(rows)} persisted event key(s) from {config.EVENT_DEDUP_DB_PATH}.")
+    except sqlite3.Error as e:
+        logger.error(f"Could not open seen-event store at {config.EVENT_DEDUP_DB_PATH}: {e}. Deduplicating in memory only.")
+        _connection = None
+
+def close_event_dedup():
+    """Closes the persisted seen-event store."""
+    global _connection
+    if _connection is not None:
+        with _db_lock:
+            _connection.close()
+        _connection = None
+
+def _event_keys(event_id: Optional[str], event: Dict[str, Any]) -> List[str]:
+    """Keys identifying a delivery: Slack's event_id, plus channel and message ts to catch re-sent events with new IDs."""
+    keys = []
+    if event_id:
+        keys.append(f"event:{event_id}")
+    if event.get("channel") and event.get("ts"):
+        keys.append(f"message:{event['channel']}:{event['ts']}")
+    return keys
+
+def _persist_keys(keys: List[str], seen_at: float):
+    if _connection is None:
+        return
+    try:
+        with _db_lock, _connection:
+            _connection.executemany(
+                "INSERT OR REPLACE INTO seen_events (key, seen_at) VALUES (?, ?)",
+                [(key, seen_at) for key in keys],
+            )
+    except sqlite3.Error as e:
+        logger.error(f"Failed to persist seen event keys {keys}: {e}")
+
+def is_duplicate_event(event_id: Optional[str], event: Dict[str, Any], retry_num: Optional[str] = None) -> bool:
+    """
+    Returns True if this event (or the message it refers to) was already seen, otherwise claims it.
+
+    The claim is held in memory only: call confirm_event once the event has been scheduled, or
+    forget_event if scheduling failed so Slack's retry of it is accepted.
+
+    Args:
+        event_id: The top-level `event_id` from the Slack payload.
+        event: The inner Slack event.
+        retry_num: The X-Slack-Retry-Num header, used for logging only.
+    """
+    global duplicates_dropped
+    keys = _event_keys(event_id, event)
+    if not keys:
+        return False
+
+    # Check and claim without awaiting in between so concurrent deliveries can't both pass
+    if any(_seen_events.contains(key) for key in keys):
+        duplicates_dropped += 1
+        logger.info(f"Dropping duplicate event {event_id} (ts: {event.get('ts')}, retry: {retry_num or 'none'}). Duplicates dropped so far: {duplicates_dropped}")
+        return True
+
+    seen_at = time.time()
+    for key in keys:
+        _seen_events.add(key, seen_at)
+    return False
+
+async def confirm_event(event_id: Optional[str], event: Dict[str, Any]):
+    """Persists a claimed event's keys after it was scheduled, so re-deliveries are dropped across restarts."""
+    keys = _event_keys(event_id, event)
+    if keys and _connection is not None:
+        await asyncio.to_thread(_persist_keys, keys, time.time())
+
+def forget_event(event_id: Optional[str], event: Dict[str, Any]):
+    """Releases a claimed event that couldn't be scheduled, so Slack's retry is processed."""
+    for key in _event_keys(event_id, event):
+        _seen_events.discard(key)
+    logger.warning(f"Forgot event {event_id} (ts: {event.get('ts')}) after scheduling failed; a retry will be processed.")
+
+def get_dedup_stats() -> Dict[str, int]:
+    """Returns the number of tracked event keys and the count of dropped duplicates."""
+    return {"tracked_keys": len(_seen_events), "duplicates_dropped": duplicates_dropped}
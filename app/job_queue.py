@@ -0,0 +1,190 @@
+"""Durable, SQLite-backed job queue processed by a bounded pool of async workers."""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_connection: Optional[sqlite3.Connection] = None
+# sqlite3 connections are not safe for concurrent use, so every statement runs under this lock
+_db_lock = threading.Lock()
+_jobs_available: Optional[asyncio.Event] = None
+_worker_tasks: List[asyncio.Task] = []
+
+def _execute(sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+    """Runs a single statement in its own transaction and returns any fetched rows."""
+    if _connection is None:
+        raise RuntimeError("Job queue not initialized.")
+    with _db_lock, _connection:
+        return _connection.execute(sql, params).fetchall()
+
+def _claim_next_job() -> Optional[sqlite3.Row]:
+    """Atomically moves the oldest pending job to running and returns it."""
+    if _connection is None:
+        raise RuntimeError("Job queue not initialized.")
+    with _db_lock, _connection:
+        row = _connection.execute(
+            "SELECT id, event_json, attempts FROM jobs WHERE state = ? ORDER BY id LIMIT 1",
+            (JOB_PENDING,),
+        ).fetchone()
+        if row is None:
+            return None
+        _connection.execute(
+            "UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+            (JOB_RUNNING, time.time(), row["id"]),
+        )
+        return row
+
+def initialize_job_queue() -> int:
+    """
+    Opens the queue database and recovers jobs left unfinished by a previous run.
+
+    Jobs that were running when the server stopped are put back to pending, unless they
+    have already used up JOB_QUEUE_MAX_ATTEMPTS, in which case they are marked failed.
+    Finished jobs older than JOB_QUEUE_RETENTION_SECONDS are deleted.
+
+    Returns:
+        The number of jobs waiting to be processed.
+    """
+    global _connection, _jobs_available
+    db_dir = os.path.dirname(config.JOB_QUEUE_DB_PATH)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+
+    _connection = sqlite3.connect(config.JOB_QUEUE_DB_PATH, check_same_thread=False)
+    _connection.row_factory = sqlite3.Row
+    _execute("PRAGMA journal_mode=WAL")
+    _execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_json TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """
+    )
+    _execute("CREATE INDEX IF NOT EXISTS idx_jobs_state_id ON jobs (state, id)")
+
+    now = time.time()
+    _execute(
+        "UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE state = ? AND attempts >= ?",
+        (JOB_FAILED, "Interrupted too many times.", now, JOB_RUNNING, config.JOB_QUEUE_MAX_ATTEMPTS),
+    )
+    _execute(
+        "UPDATE jobs SET state = ?, updated_at = ? WHERE state = ?",
+        (JOB_PENDING, now, JOB_RUNNING),
+    )
+    _execute(
+        "DELETE FROM jobs WHERE state IN (?, ?) AND updated_at < ?",
+        (JOB_DONE, JOB_FAILED, now - config.JOB_QUEUE_RETENTION_SECONDS),
+    )
+
+    _jobs_available = asyncio.Event()
+    pending_count = _execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (JOB_PENDING,))[0][0]
+    logger.info(f"Job queue initialized at {config.JOB_QUEUE_DB_PATH}. Pending jobs: {pending_count}")
+    if pending_count:
+        _jobs_available.set()
+    return pending_count
+
+async def enqueue_job(event: Dict[str, Any]) -> int:
+    """Persists a Slack event as a pending job and wakes up an idle worker. Returns the job ID."""
+    now = time.time()
+
+    def insert() -> int:
+        if _connection is None:
+            raise RuntimeError("Job queue not initialized.")
+        with _db_lock, _connection:
+            cursor = _connection.execute(
+                "INSERT INTO jobs (event_json, state, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (json.dumps(event), JOB_PENDING, now, now),
+            )
+            return cursor.lastrowid
+
+    job_id = await asyncio.to_thread(insert)
+    logger.info(f"Enqueued job {job_id} for event {event.get('ts')} in channel {event.get('channel')}")
+    if _jobs_available:
+        _jobs_available.set()
+    return job_id
+
+async def _worker(worker_id: int, handler: JobHandler):
+    """Claims pending jobs in order and runs them through the handler until cancelled."""
+    assert _jobs_available is not None
+    while True:
+        # Clear before claiming: a job enqueued while the claim runs sets the event again,
+        # so it can't be missed between an empty claim and the wait
+        _jobs_available.clear()
+        job = await asyncio.to_thread(_claim_next_job)
+        if job is None:
+            await _jobs_available.wait()
+            continue
+
+        job_id = job["id"]
+        logger.info(f"Worker {worker_id} picked up job {job_id} (attempt {job['attempts'] + 1})")
+        start_time = time.time()
+        try:
+            await handler(json.loads(job["event_json"]))
+        except asyncio.CancelledError:
+            # Leave the job as running; it is recovered on the next startup.
+            logger.warning(f"Worker {worker_id} cancelled while running job {job_id}. It will be retried on restart.")
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            await asyncio.to_thread(
+                _execute,
+                "UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE id = ?",
+                (JOB_FAILED, str(e), time.time(), job_id),
+            )
+            continue
+
+        await asyncio.to_thread(
+            _execute,
+            "UPDATE jobs SET state = ?, updated_at = ? WHERE id = ?",
+            (JOB_DONE, time.time(), job_id),
+        )
+        logger.info(f"Job {job_id} completed in {time.time() - start_time:.2f} seconds.")
+
+def start_workers(handler: JobHandler):
+    """Starts JOB_QUEUE_WORKERS workers that run queued jobs through the handler."""
+    for worker_id in range(1, config.JOB_QUEUE_WORKERS + 1):
+        _worker_tasks.append(asyncio.create_task(_worker(worker_id, handler), name=f"job-worker-{worker_id}"))
+    logger.info(f"Started {config.JOB_QUEUE_WORKERS} job queue worker(s).")
+
+async def stop_workers():
+    """Cancels the workers and closes the queue database. Interrupted jobs stay recoverable."""
+    global _connection
+    for task in _worker_tasks:
+        task.cancel()
+    await asyncio.gather(*_worker_tasks, return_exceptions=True)
+    _worker_tasks.clear()
+    if _connection is not None:
+        with _db_lock:
+            _connection.close()
+        _connection = None
+    logger.info("Job queue workers stopped.")
+
+def get_queue_stats() -> Dict[str, int]:
+    """Returns the number of jobs in each state."""
+    if _connection is None:
+        return {}
+    rows = _execute("SELECT state, COUNT(*) AS count FROM jobs GROUP BY state")
+    return {row["state"]: row["count"] for row in rows}
@@ -2,11 +2,11 @@ import json
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Request, HTTPException
 from slack_sdk.signature import SignatureVerifier
 import uvicorn
 
-from app import config, slack_handler, background_processor, playwright_handler, openai_handler
+from app import config, slack_handler, background_processor, playwright_handler, browser_health, openai_handler, job_queue, event_dedup, transcription_cache, transcription_engines
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -20,26 +20,41 @@ signature_verifier = SignatureVerifier(config.SLACK_SIGNING_SECRET) if config.SL
 async def lifespan(app: FastAPI):
     # Startup: Initialize Slack client, fetch bot info, initialize Playwright
     logger.info("Application startup...")
-    # Initialize Slack clients first (sync)
-    slack_handler.initialize_slack_clients()
-    # Then fetch bot ID (sync)
-    slack_handler.fetch_bot_user_id()
-    # Initialize OpenAI client (sync)
+    # Initialize the shared async Slack client first
+    await slack_handler.initialize_slack_clients()
+    # Then fetch bot ID
+    await slack_handler.fetch_bot_user_id()
+    # Initialize async OpenAI client, then pick transcription engines
     openai_handler.initialize_openai_client()
+    transcription_engines.initialize_transcription_engines()
     # Initialize Playwright (async) - Connect to existing Chrome instances
     await playwright_handler.initialize_playwright_connections()
+    # Watch the browser connections and reconnect them when Chrome restarts
+    browser_health.start_health_monitor()
+    # Load previously seen Slack events so re-deliveries are dropped
+    event_dedup.initialize_event_dedup()
+    # Open the job queue, recover unfinished jobs and start the workers
+    job_queue.initialize_job_queue()
+    job_queue.start_workers(background_processor.process_message_event)
     logger.info("Startup complete.")
     yield
-    # Shutdown: Close Playwright connections
+    # Shutdown: Stop workers (unfinished jobs are recovered on next startup) and follow-ups, then close Playwright connections
     logger.info("Application shutdown...")
+    await job_queue.stop_workers()
+    await background_processor.cancel_follow_ups()
+    event_dedup.close_event_dedup()
+    await browser_health.stop_health_monitor()
     await playwright_handler.close_playwright_connections()
+    await slack_handler.close_slack_clients()
+    await transcription_engines.close_transcription_engines()
+    await openai_handler.close_openai_client()
     logger.info("Shutdown complete.")
 
 app = FastAPI(lifespan=lifespan)
 
 # --- Slack Event Endpoint ---
 @app.post("/slack/events")
-async def slack_events(request: Request, background_tasks: BackgroundTasks):
+async def slack_events(request: Request):
     # Verify request signature
     body_bytes = await request.body()
     timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
@@ -71,13 +86,25 @@ async def slack_events(request: Request, background_tasks: BackgroundTasks):
         event = payload.get("event", {})
         logger.info(f"Received event callback: {event.get('type')}")
 
-        # Process only if it should be handled (delegates validation)
-        if slack_handler.should_process_event(event):
-            logger.info(f"Processing event: {event.get('ts')} in channel {event.get('channel')}")
-            # Use background task for actual processing
-            background_tasks.add_task(background_processor.process_message_event, event)
-        else:
-            logger.info(f"Skipping event: {event.get('ts')} (type: {event.get('type')}, subtype: {event.get('subtype')})")
+        # Drop Slack retries and repeated deliveries of events we've already scheduled
+        retry_num = request.headers.get("X-Slack-Retry-Num")
+        event_id = payload.get("event_id")
+        if event_dedup.is_duplicate_event(event_id, event, retry_num):
+            return {"status": "ok"}
+
+        try:
+            # Process only if it should be handled (delegates validation)
+            if slack_handler.should_process_event(event):
+                logger.info(f"Processing event: {event.get('ts')} in channel {event.get('channel')}")
+                # Persist the event; a queue worker picks it up for actual processing
+                await job_queue.enqueue_job(event)
+            else:
+                logger.info(f"Skipping event: {event.get('ts')} (type: {event.get('type')}, subtype: {event.get('subtype')})")
+        except Exception:
+            # Not scheduled: let Slack's retry through instead of dropping it as a duplicate
+            event_dedup.forget_event(event_id, event)
+            raise
+        await event_dedup.confirm_event(event_id, event)
 
     # Acknowledge receipt immediately
     return {"status": "ok"}
@@ -87,6 +114,16 @@ async def slack_events(request: Request, background_tasks: BackgroundTasks):
 async def root():
     return {"message": "Slack Audio Processor is running."}
 
+# --- Stats Endpoint ---
+@app.get("/stats")
+async def stats():
+    return {
+        "event_dedup": event_dedup.get_dedup_stats(),
+        "job_queue": job_queue.get_queue_stats(),
+        "transcription_cache": transcription_cache.get_cache_stats(),
+        "browser_health": browser_health.get_health_stats(),
+    }
+
 # --- Main Execution Block (for running directly) ---
 if __name__ == "__main__":
     # Ensure config is loaded before running uvicorn if running as script
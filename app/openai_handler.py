@@ -1,50 +1,79 @@
+import asyncio
 import logging
-import io
-from openai import OpenAI, OpenAIError
-from typing import Optional, Tuple
+import os
+import tempfile
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAIError
+from typing import BinaryIO, Optional
 
-from . import config
+from . import audio_processing, config
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client: Optional[OpenAI] = None
+# Initialize OpenAI client (async, so transcription never blocks the event loop)
+openai_client: Optional[AsyncOpenAI] = None
 
 def initialize_openai_client():
-    """Initializes the OpenAI client using the API key from config."""
+    """Initializes the async OpenAI client, with a pooled HTTP client, using the API key from config."""
     global openai_client
     if config.OPENAI_API_KEY:
-        openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=config.OPENAI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.OPENAI_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+        openai_client = AsyncOpenAI(
+            api_key=config.OPENAI_API_KEY,
+            http_client=http_client,
+            timeout=config.OPENAI_TRANSCRIPTION_TIMEOUT_SECONDS,
+        )
         logger.info("OpenAI client initialized successfully.")
     else:
         logger.warning("OpenAI client not initialized due to missing API key. Transcription will be skipped.")
 
-def transcribe_audio(audio_bytes: bytes, filename: str, mimetype: str) -> Optional[str]:
-    """Transcribes audio bytes using the OpenAI Whisper API."""
+async def close_openai_client():
+    """Closes the OpenAI client and its connection pool."""
+    global openai_client
+    if openai_client:
+        await openai_client.close()
+        logger.info("OpenAI client closed.")
+    openai_client = None
+
+async def transcribe_audio(audio_file: BinaryIO, filename: str, mimetype: str) -> Optional[str]:
+    """
+    Transcribes an audio file object (e.g. a spooled download) using the OpenAI Whisper API.
+
+    The whole call, including SDK retries, is bounded by OPENAI_TRANSCRIPTION_TIMEOUT_SECONDS.
+    Cancelling the calling task aborts the in-flight request.
+    """
     if not openai_client:
         logger.warning("Cannot transcribe audio: OpenAI client not initialized.")
         return None
-    if not audio_bytes:
-        logger.warning("Cannot transcribe audio: No audio bytes provided.")
+    if not audio_file:
+        logger.warning("Cannot transcribe audio: No audio file provided.")
         return None
 
     try:
         logger.info("Sending audio data to OpenAI Whisper API for transcription...")
-        # Prepare file-like object for OpenAI API
-        audio_file_object = io.BytesIO(audio_bytes)
+        audio_file.seek(0)
         # Whisper needs a filename hint for format detection.
-        file_tuple = (filename, audio_file_object, mimetype if mimetype else 'application/octet-stream')
+        file_tuple = (filename, audio_file, mimetype if mimetype else 'application/octet-stream')
 
-        transcription_response = openai_client.audio.transcriptions.create(
-            model="whisper-1",
-            file=file_tuple
-            # language="en" # Optional: specify language
-        )
+        async with asyncio.timeout(config.OPENAI_TRANSCRIPTION_TIMEOUT_SECONDS):
+            transcription_response = await openai_client.audio.transcriptions.create(
+                model=config.OPENAI_MODEL,
+                file=file_tuple
+                # language="en" # Optional: specify language
+            )
         transcript = transcription_response.text
         logger.info(f"Transcription successful. Transcript length: {len(transcript)}")
         logger.debug(f"Transcript preview: '{transcript[:100]}...'")
         return transcript
 
+    except TimeoutError:
+        logger.error(f"Transcription timed out after {config.OPENAI_TRANSCRIPTION_TIMEOUT_SECONDS} seconds.")
+        return None
     except OpenAIError as e:
         logger.error(f"OpenAI API error during transcription: {e}")
         # Return None to indicate transcription failure due to API error
@@ -52,4 +81,84 @@ def transcribe_audio(audio_bytes: bytes, filename: str, mimetype: str) -> Option
     except Exception as e:
         logger.error(f"Unexpected error during transcription: {e}", exc_info=True)
         # Return None for other unexpected errors
-        return None 
\ No newline at end of file
+        return None
+
+async def _transcribe_compact(input_path: str, work_dir: str, audio_file: BinaryIO, filename: str, mimetype: str) -> Optional[str]:
+    """Transcodes the audio to compact mono speech encoding and uploads whichever version is smaller."""
+    if config.AUDIO_TRANSCODE_ENABLED:
+        speech_name = f"{os.path.splitext(filename)[0]}.{config.AUDIO_SPEECH_FORMAT}"
+        speech_path = os.path.join(work_dir, f"speech.{config.AUDIO_SPEECH_FORMAT}")
+        try:
+            await audio_processing.extract_segment(input_path, speech_path, 0.0, None)
+            original_size = audio_processing.get_file_size(audio_file)
+            speech_size = os.path.getsize(speech_path)
+            if speech_size < original_size:
+                logger.info(f"Transcoded audio from {original_size} to {speech_size} bytes before upload.")
+                with open(speech_path, "rb") as speech_file:
+                    return await transcribe_audio(speech_file, speech_name, config.AUDIO_SPEECH_MIMETYPE)
+            logger.info(f"Transcoded audio ({speech_size} bytes) is not smaller than the original ({original_size} bytes). Uploading the original.")
+        except audio_processing.AudioProcessingError as e:
+            logger.warning(f"Could not transcode audio ({e}). Uploading the original.")
+    return await transcribe_audio(audio_file, filename, mimetype)
+
+async def transcribe_audio_chunked(audio_file: BinaryIO, filename: str, mimetype: str) -> Optional[str]:
+    """
+    Transcribes audio via the Whisper API, preprocessing it with ffmpeg when that helps.
+
+    Files up to AUDIO_TRANSCODE_MIN_BYTES are uploaded as-is. Larger files are transcoded to
+    compact mono speech encoding before upload. Long recordings are split at silences and the
+    chunks transcribed concurrently: at most TRANSCRIPTION_CHUNK_CONCURRENCY chunks are
+    extracted and transcribed at once, and the chunk transcripts are joined in playback order.
+    Falls back to uploading the original file when ffmpeg is not installed.
+
+    Returns:
+        The full transcript, or None if any chunk failed.
+    """
+    audio_size = audio_processing.get_file_size(audio_file)
+    if audio_size <= config.AUDIO_TRANSCODE_MIN_BYTES:
+        return await transcribe_audio(audio_file, filename, mimetype)
+    if not audio_processing.ffmpeg_available():
+        if audio_size > config.OPENAI_MAX_UPLOAD_BYTES:
+            logger.warning("Audio exceeds the Whisper upload limit but ffmpeg is not installed for chunking. Trying a single upload.")
+        return await transcribe_audio(audio_file, filename, mimetype)
+
+    with tempfile.TemporaryDirectory(prefix="chorus_audio_") as work_dir:
+        input_path = os.path.join(work_dir, f"input{os.path.splitext(filename)[1] or '.bin'}")
+        await audio_processing.save_to_path(audio_file, input_path)
+        chunks = [(0.0, None)]
+        if config.TRANSCRIPTION_CHUNKING_ENABLED:
+            try:
+                chunks = await audio_processing.plan_chunks(input_path)
+            except audio_processing.AudioProcessingError as e:
+                logger.warning(f"Could not plan audio chunks ({e}). Falling back to a single upload.")
+
+        if len(chunks) == 1:
+            return await _transcribe_compact(input_path, work_dir, audio_file, filename, mimetype)
+
+        semaphore = asyncio.Semaphore(config.TRANSCRIPTION_CHUNK_CONCURRENCY)
+
+        async def transcribe_chunk(index: int, start: float, end: Optional[float]) -> Optional[str]:
+            async with semaphore:
+                chunk_name = f"chunk_{index:03d}.{config.AUDIO_SPEECH_FORMAT}"
+                chunk_path = os.path.join(work_dir, chunk_name)
+                try:
+                    await audio_processing.extract_segment(input_path, chunk_path, start, end)
+                except audio_processing.AudioProcessingError as e:
+                    logger.error(f"Failed to extract audio chunk {index}: {e}")
+                    return None
+                with open(chunk_path, "rb") as chunk_file:
+                    logger.info(f"Transcribing chunk {index + 1}/{len(chunks)} ({start:.0f}s - {f'{end:.0f}s' if end else 'end'})...")
+                    return await transcribe_audio(chunk_file, chunk_name, config.AUDIO_SPEECH_MIMETYPE)
+
+        chunk_transcripts = await asyncio.gather(
+            *(transcribe_chunk(index, start, end) for index, (start, end) in enumerate(chunks))
+        )
+
+    if any(chunk_transcript is None for chunk_transcript in chunk_transcripts):
+        failed = [index for index, chunk_transcript in enumerate(chunk_transcripts) if chunk_transcript is None]
+        logger.error(f"Chunked transcription failed for chunk(s) {failed}.")
+        return None
+
+    transcript = " ".join(chunk_transcript.strip() for chunk_transcript in chunk_transcripts if chunk_transcript)
+    logger.info(f"Chunked transcription successful: {len(chunks)} chunks, transcript length {len(transcript)}")
+    return transcript
@@ -0,0 +1,203 @@
+"""In-page helper script that runs whole submission steps in a single CDP round trip."""
+
+import logging
+from typing import Any, Dict
+
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+# Installed as `window.__aiChorus`. Every step takes one argument object and resolves to a
+# plain object with `ok` (bool) and, on failure, a short `reason`, so the Python side can
+# decide whether to fall back to locators. Selectors are always passed in from the handler.
+HELPER_SCRIPT = r"""
+(() => {
+  if (window.__aiChorus) return;
+
+  const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+  const isVisible = (element) => {
+    if (!element) return false;
+    const rect = element.getBoundingClientRect();
+    const style = getComputedStyle(element);
+    return rect.width > 0 && rect.height > 0 && style.visibility !== "hidden" && style.display !== "none";
+  };
+
+  const isEnabled = (element) =>
+    !!element && !element.disabled && !element.hasAttribute("disabled") && element.getAttribute("aria-disabled") !== "true";
+
+  // Polls until `predicate` returns a truthy value or `timeoutMs` passes.
+  const waitFor = async (predicate, timeoutMs) => {
+    const deadline = Date.now() + timeoutMs;
+    while (true) {
+      const value = predicate();
+      if (value) return value;
+      if (Date.now() >= deadline) return null;
+      await sleep(50);
+    }
+  };
+
+  const last = (selector) => {
+    const elements = document.querySelectorAll(selector);
+    return elements.length ? elements[elements.length - 1] : null;
+  };
+
+  // Response tracking: a MutationObserver records when the latest answer last changed.
+  const responseTracker = { selector: null, observer: null, lastChange: 0 };
+
+  const trackResponse = (selector) => {
+    if (responseTracker.selector === selector) return;
+    if (responseTracker.observer) responseTracker.observer.disconnect();
+    responseTracker.selector = selector;
+    responseTracker.lastChange = Date.now();
+    responseTracker.observer = new MutationObserver((mutations) => {
+      const answer = last(selector);
+      if (!answer) return;
+      for (const mutation of mutations) {
+        const target = mutation.target.nodeType === Node.ELEMENT_NODE ? mutation.target : mutation.target.parentElement;
+        // Changes inside the answer, or a new answer element being added, both count as progress
+        if (target && (answer.contains(target) || target.contains(answer))) {
+          responseTracker.lastChange = Date.now();
+          return;
+        }
+      }
+    });
+    responseTracker.observer.observe(document.body, { childList: true, subtree: true, characterData: true });
+  };
+
+  window.__aiChorus = {
+    // Composer readiness, toggle states and model switcher label in one read.
+    composerState({ input, toggles = {}, modelSwitcher = null }) {
+      const inputElement = document.querySelector(input);
+      const toggleStates = {};
+      for (const [name, selector] of Object.entries(toggles)) {
+        const element = document.querySelector(selector);
+        toggleStates[name] = element ? element.getAttribute("aria-pressed") === "true" : null;
+      }
+      const switcher = modelSwitcher ? last(modelSwitcher) : null;
+      return {
+        ok: true,
+        inputReady: isVisible(inputElement) && inputElement.isContentEditable,
+        inputEmpty: !!inputElement && inputElement.innerText.trim() === "",
+        toggles: toggleStates,
+        modelLabel: switcher ? switcher.innerText : null,
+      };
+    },
+
+    // Clicks every toggle whose aria-pressed differs from the desired state and waits for it to flip.
+    async setToggles({ toggles, timeoutMs = 3000 }) {
+      const states = {};
+      for (const { name, selector, desired } of toggles) {
+        const element = await waitFor(() => {
+          const candidate = document.querySelector(selector);
+          return isVisible(candidate) ? candidate : null;
+        }, timeoutMs);
+        if (!element) return { ok: false, reason: `${name} toggle not found`, states };
+        if ((element.getAttribute("aria-pressed") === "true") !== desired) {
+          element.click();
+          const flipped = await waitFor(
+            () => (document.querySelector(selector)?.getAttribute("aria-pressed") === "true") === desired,
+            timeoutMs,
+          );
+          if (!flipped) return { ok: false, reason: `${name} toggle did not change`, states };
+        }
+        states[name] = desired;
+      }
+      return { ok: true, states };
+    },
+
+    // Latest answer text and whether it is still streaming. The answer is complete once the
+    // service's streaming indicator is gone and the text hasn't changed for `quietMs`.
+    responseState({ response, streaming, quietMs = 3000 }) {
+      trackResponse(response);
+      const answer = last(response);
+      const text = answer ? answer.innerText.trim() : "";
+      const isStreaming = !!document.querySelector(streaming);
+      const quietFor = Date.now() - responseTracker.lastChange;
+      return {
+        ok: true,
+        text,
+        streaming: isStreaming,
+        complete: text !== "" && !isStreaming && quietFor >= quietMs,
+      };
+    },
+
+    // Inserts text as a single synthetic paste; editors apply it in one transaction.
+    pasteText({ input, text }) {
+      const inputElement = document.querySelector(input);
+      if (!inputElement) return { ok: false, reason: "input not found", length: 0 };
+      inputElement.focus();
+      const data = new DataTransfer();
+      data.setData("text/plain", text);
+      inputElement.dispatchEvent(new ClipboardEvent("paste", { clipboardData: data, bubbles: true, cancelable: true }));
+      return { ok: true, length: inputElement.innerText.length };
+    },
+
+    // Types the prompt into the composer and clicks send once the button is enabled.
+    async fillAndSubmit({ input, submit, text, timeoutMs = 10000 }) {
+      const inputElement = await waitFor(() => {
+        const candidate = document.querySelector(input);
+        return isVisible(candidate) ? candidate : null;
+      }, timeoutMs);
+      if (!inputElement) return { ok: false, reason: "input not found", submitted: false };
+
+      inputElement.focus();
+      // execCommand goes through the editor's own input handling (ProseMirror, Quill),
+      // which setting textContent directly would bypass.
+      document.execCommand("selectAll", false, null);
+      document.execCommand("insertText", false, text);
+      if (inputElement.innerText.trim() === "") {
+        return { ok: false, reason: "text not inserted", submitted: false };
+      }
+
+      const button = await waitFor(() => {
+        const candidate = document.querySelector(submit);
+        return isVisible(candidate) && isEnabled(candidate) ? candidate : null;
+      }, timeoutMs);
+      if (!button) return { ok: false, reason: "submit button not enabled", submitted: false };
+      // Click after this call has returned, so a navigation triggered by sending can't
+      // destroy the context mid-call and make a successful submit look like a failure.
+      setTimeout(() => button.click(), 0);
+      return { ok: true, submitted: true };
+    },
+  };
+})();
+"""
+
+# Calls a step if the helper is present; otherwise reports it missing without throwing
+_CALL_STEP_SCRIPT = """
+([step, args]) => window.__aiChorus
+  ? window.__aiChorus[step](args)
+  : { ok: false, reason: "helper missing", missing: true }
+"""
+
+async def install_page_helpers(context: BrowserContext):
+    """
+    Registers the helper for every document loaded in the context from now on.
+
+    Documents that were already open get it injected on first use by run_page_helper.
+    """
+    try:
+        await context.add_init_script(HELPER_SCRIPT)
+    except Exception as e:
+        logger.warning(f"Could not install page helper script: {e}. Falling back to locators.")
+
+async def run_page_helper(page: Page, step: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs one helper step in the page in a single round trip.
+
+    Re-injects the helper once if the current document doesn't have it (e.g. it loaded
+    before the init script was registered).
+
+    Returns:
+        The step's result object; {"ok": False, "reason": ...} if the step couldn't run.
+    """
+    try:
+        result = await page.evaluate(_CALL_STEP_SCRIPT, [step, args])
+        if result.get("missing"):
+            await page.evaluate(HELPER_SCRIPT)
+            result = await page.evaluate(_CALL_STEP_SCRIPT, [step, args])
+        return result
+    except Exception as e:
+        logger.warning(f"Page helper step '{step}' failed: {e}")
+        return {"ok": False, "reason": str(e)}
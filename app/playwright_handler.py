@@ -1,38 +1,180 @@
 """Handles Playwright browser connection, management, and actions."""
 
+import asyncio
 import logging
 import datetime
 import time # Added for small delays
-import os # Added for screenshot path
-from typing import Dict, Optional
+import re
+import uuid
+from urllib.parse import urlencode, urlparse
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 from playwright.async_api import (
     async_playwright,
     Browser,
     BrowserContext,
+    Locator,
     Page,
     Playwright,
     expect,
+    Error as PlaywrightError,
     TimeoutError as PlaywrightTimeoutError,
 )
 
-from app import config
+from app import config, page_helpers, screenshot_processing
 
 logger = logging.getLogger(__name__)
 
 # Dictionary to hold the Playwright browsers, contexts and pages
-# Key: service name (str), Value: dict{'browser': Browser, 'context': BrowserContext, 'page': Page}
-PLAYWRIGHT_INSTANCES: Dict[str, Dict[str, Optional[Browser | BrowserContext | Page]]] = {}
+# Key: service name (str), Value: dict{'browser': Browser, 'context': BrowserContext, 'page': Page, 'pool': PagePool}
+# 'page' is the first tab of the pool, kept for callers that don't need exclusive access.
+PLAYWRIGHT_INSTANCES: Dict[str, Dict[str, Any]] = {}
 _playwright_instance: Optional[Playwright] = None
 
+class PagePool:
+    """
+    A fixed set of tabs for one service, each leased to a single submission at a time.
+
+    Submissions lease a tab, drive it, and release it when done. When every tab is
+    leased, further leases wait until one is released (or the lease times out).
+
+    If a `warmer` is given, each tab is prepared for the next submission (see
+    warm_composer) before it becomes idle, so while one tab serves a message the
+    others are already waiting on a fresh composer.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        context: BrowserContext,
+        service_url: str,
+        warmer: Optional[Callable[[Page], Awaitable[bool]]] = None,
+    ):
+        self.service_name = service_name
+        self.context = context
+        self.service_url = service_url
+        self.warmer = warmer
+        self.pages: List[Page] = []
+        self._idle_pages: asyncio.Queue[Page] = asyncio.Queue()
+        self._warm_tasks: Set[asyncio.Task] = set()
+        self._crashed_pages: "weakref.WeakSet[Page]" = weakref.WeakSet()
+
+    async def fill(self, size: int):
+        """Reuses the context's existing tabs and opens new ones until the pool has `size` tabs."""
+        for page in self.context.pages[:size]:
+            self._add_page(page)
+        while len(self.pages) < size:
+            self._add_page(await self._open_page())
+        logger.info(f"Page pool for {self.service_name} ready with {len(self.pages)} tab(s).")
+
+    async def lease(self, timeout: Optional[float] = None) -> Page:
+        """
+        Waits for an idle tab and returns it. Raises TimeoutError if none frees up in time.
+
+        If the tab has to be replaced and that fails or is cancelled, the tab goes back to the
+        idle queue (the next lease tries the replacement again), so the pool never shrinks.
+        """
+        async with asyncio.timeout(timeout):
+            page = await self._idle_pages.get()
+        if page.is_closed() or page in self._crashed_pages:
+            logger.warning(f"Leased {self.service_name} tab was closed or crashed. Opening a replacement...")
+            try:
+                page = await self._replace_page(page)
+            except BaseException as e:
+                self._idle_pages.put_nowait(page)
+                if not isinstance(e, asyncio.CancelledError):
+                    logger.error(f"Could not replace {self.service_name} tab: {e}. Returned it to the pool.")
+                raise
+        return page
+
+    async def release(self, page: Page):
+        """Returns a leased tab to the pool, replacing it first if it was closed or crashed."""
+        if not any(pool_page is page for pool_page in self.pages):
+            # Leased from a pool that was replaced by a reconnect; nothing to return it to
+            logger.info(f"Ignoring release of a {self.service_name} tab that isn't in the current pool.")
+            return
+        if page.is_closed() or page in self._crashed_pages:
+            logger.warning(f"Released {self.service_name} tab was closed or crashed. Opening a replacement...")
+            try:
+                page = await self._replace_page(page)
+            except Exception as e:
+                logger.error(f"Could not replace closed {self.service_name} tab: {e}. Pool shrinks by one.")
+                return
+        self._make_idle(page)
+
+    @property
+    def idle_count(self) -> int:
+        return self._idle_pages.qsize()
+
+    def close(self):
+        """Stops any tab preparation still running in the background."""
+        for task in self._warm_tasks:
+            task.cancel()
+        self._warm_tasks.clear()
+
+    def _add_page(self, page: Page):
+        self.pages.append(page)
+        self._watch_for_crash(page)
+        self._make_idle(page)
+
+    def _watch_for_crash(self, page: Page):
+        def on_crash(crashed_page: Page):
+            logger.error(f"A {self.service_name} tab crashed. It will be replaced when next leased or released.")
+            self._crashed_pages.add(crashed_page)
+        page.on("crash", on_crash)
+
+    def _make_idle(self, page: Page):
+        """Queues the tab for leasing, preparing it in the background first if a warmer is set."""
+        if self.warmer is None:
+            self._idle_pages.put_nowait(page)
+            return
+        task = asyncio.create_task(self._warm_then_idle(page), name=f"warm-{self.service_name}")
+        self._warm_tasks.add(task)
+        task.add_done_callback(self._warm_tasks.discard)
+
+    async def _warm_then_idle(self, page: Page):
+        # A lease waiting on this tab would have to do the same preparation itself,
+        # so holding the tab back until it's warm costs the waiter nothing.
+        try:
+            async with asyncio.timeout(config.PLAYWRIGHT_WARM_TIMEOUT_SECONDS):
+                await self.warmer(page)
+        except TimeoutError:
+            logger.warning(f"Preparing {self.service_name} tab took over {config.PLAYWRIGHT_WARM_TIMEOUT_SECONDS}s. Returning it unprepared.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Preparing {self.service_name} tab failed: {e}. Returning it unprepared.")
+        self._idle_pages.put_nowait(page)
+
+    async def _open_page(self) -> Page:
+        page = await self.context.new_page()
+        await page.goto(self.service_url, wait_until="domcontentloaded")
+        return page
+
+    async def _replace_page(self, closed_page: Page) -> Page:
+        if not closed_page.is_closed():
+            try:
+                await closed_page.close()
+            except Exception as e:
+                logger.warning(f"Could not close crashed {self.service_name} tab: {e}")
+        new_page = await self._open_page()
+        self._watch_for_crash(new_page)
+        self.pages = [new_page if page is closed_page else page for page in self.pages]
+        return new_page
+
 # --- Start ChatGPT Specific Selectors (from chatgpt_playwright_integration.mdc) ---
 CHATGPT_INPUT_SELECTOR = "#prompt-textarea[contenteditable=\"true\"]"
 CHATGPT_SUBMIT_BUTTON_SELECTOR = "button[data-testid=\"send-button\"]"
 CHATGPT_URL_PATTERN = "**/c/**" # Pattern for the new chat URL
+CHATGPT_CHAT_URL_REGEX = re.compile(r"/c/[\w-]+")
 CHATGPT_NEW_CHAT_BUTTON_SELECTOR = "a[data-testid=\"create-new-chat-button\"]"
 CHATGPT_MODEL_SWITCHER_SELECTOR = "[data-testid=\"model-switcher-dropdown-button\"]"
 CHATGPT_MODEL_OPTION_SELECTOR_TPL = "div[data-testid=\"model-switcher-{model_suffix}\"]"
 CHATGPT_SEARCH_TOGGLE_SELECTOR = "[data-testid=\"composer-button-search\"]"
 CHATGPT_DEEP_RESEARCH_TOGGLE_SELECTOR = "[data-testid=\"composer-button-deep-research\"]"
+# New chat URL; the model can be preselected with ?model=<model_suffix>
+CHATGPT_NEW_CHAT_URL = "https://chatgpt.com/"
+CHATGPT_FILE_INPUT_SELECTOR = 'input[type="file"]'
 # --- End ChatGPT Specific Selectors ---
 
 # --- Start Claude Specific Selectors (from claude_playwright_integration.mdc) ---
@@ -41,8 +183,13 @@ CLAUDE_TEXT_INPUT_SELECTOR = '.ProseMirror[contenteditable="true"]'
 CLAUDE_SETTINGS_BUTTON_SELECTOR = 'button[data-testid="input-menu-tools"]'
 CLAUDE_EXTENDED_THINKING_TOGGLE_BUTTON_SELECTOR = 'button:has(p:text-is("Extended thinking"))'
 CLAUDE_EXTENDED_THINKING_CHECKBOX_SELECTOR = 'input[type="checkbox"]' # Relative to button
+# Pill shown in the composer (outside the tools popover) while Extended thinking is on
+CLAUDE_EXTENDED_THINKING_INDICATOR_SELECTOR = 'fieldset button[aria-pressed="true"][aria-label*="thinking" i]'
 CLAUDE_SUBMIT_BUTTON_SELECTOR = 'button[aria-label="Send message"]'
 CLAUDE_CHAT_URL_PATTERN = "**/chat/**"
+CLAUDE_CHAT_URL_REGEX = re.compile(r"/chat/[\w-]+")
+CLAUDE_NEW_CHAT_URL = "https://claude.ai/new"
+CLAUDE_FILE_INPUT_SELECTOR = 'input[type="file"]'
 # --- End Claude Specific Selectors ---
 
 # --- Start Gemini Specific Selectors (from gemini_playwright_integration.mdc) ---
@@ -51,8 +198,200 @@ GEMINI_TEXT_INPUT_SELECTOR = 'div.ql-editor[role="textbox"][aria-label="Enter a
 GEMINI_SUBMIT_BUTTON_ENABLED_SELECTOR = 'button[aria-label="Send message"]:not([aria-disabled="true"])'
 # Used for waiting strategy:
 GEMINI_THINKING_INDICATOR_SELECTOR = "model-thoughts"
+# Conversation route the app pushes once the prompt is accepted
+GEMINI_CHAT_URL_REGEX = re.compile(r"/app/[0-9a-f]+")
 # --- End Gemini Specific Selectors ---
 
+# --- Start Response Selectors ---
+# The latest answer, and an element that only exists while an answer is being generated
+RESPONSE_SELECTORS = {
+    "chatgpt": {"response": 'div[data-message-author-role="assistant"]', "streaming": 'button[data-testid="stop-button"]'},
+    "claude": {"response": "div.font-claude-message", "streaming": 'div[data-is-streaming="true"]'},
+    "gemini": {"response": "message-content", "streaming": 'button[aria-label="Stop response"]'},
+}
+# --- End Response Selectors ---
+
+class StepTimer:
+    """Measures and logs how long each step of a submission takes."""
+
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+        self.start_time = time.perf_counter()
+        self._last_mark = self.start_time
+        self.step_durations: Dict[str, float] = {}
+
+    def mark(self, step_name: str):
+        """Records the time since the previous mark as the duration of `step_name`."""
+        now = time.perf_counter()
+        self.step_durations[step_name] = now - self._last_mark
+        self._last_mark = now
+        logger.info(f"[{self.service_name}] Step '{step_name}' took {self.step_durations[step_name]:.2f}s")
+
+    def summary(self) -> str:
+        steps = ", ".join(f"{name}={duration:.2f}s" for name, duration in self.step_durations.items())
+        return f"total={time.perf_counter() - self.start_time:.2f}s ({steps})"
+
+class ChatUrlWatcher:
+    """
+    Captures the chat URL as soon as the page's main frame navigates to it.
+
+    Playwright reports history.pushState route changes as frame navigations, so the URL is
+    seen the moment the app switches to the new conversation. Create the watcher before
+    clicking send so the navigation can't be missed, and call stop() when done.
+    The URL the tab was on when the watcher was created (e.g. a previous conversation the
+    tab never left) is never reported.
+    """
+
+    def __init__(self, page: Page, url_regex: re.Pattern):
+        self.page = page
+        self.url_regex = url_regex
+        self.start_url = page.url
+        self._url_future: asyncio.Future = asyncio.get_running_loop().create_future()
+        page.on("framenavigated", self._on_frame_navigated)
+
+    def _is_new_chat_url(self, url: str) -> bool:
+        return url != self.start_url and bool(self.url_regex.search(url))
+
+    def _on_frame_navigated(self, frame):
+        if frame is self.page.main_frame and not self._url_future.done() and self._is_new_chat_url(frame.url):
+            self._url_future.set_result(frame.url)
+
+    async def wait(self, timeout: float) -> Optional[str]:
+        """Returns the new chat URL, or None if the page didn't navigate to one within `timeout` seconds."""
+        if not self._url_future.done() and self._is_new_chat_url(self.page.url):
+            return self.page.url
+        try:
+            async with asyncio.timeout(timeout):
+                return await asyncio.shield(self._url_future)
+        except TimeoutError:
+            return None
+
+    def stop(self):
+        self.page.remove_listener("framenavigated", self._on_frame_navigated)
+
+async def watch_response(
+    page: Page,
+    service_name: str,
+    on_update: Callable[[str, bool], Awaitable[None]],
+    timeout: float,
+) -> Optional[str]:
+    """
+    Follows the answer being generated in a chat tab until it is complete.
+
+    A MutationObserver in the page (see page_helpers) tracks the latest answer; it is polled
+    once per RESPONSE_MIRROR_UPDATE_INTERVAL_SECONDS with a single evaluate call.
+
+    Stops early, reporting what's there, if the tab is closed, if
+    RESPONSE_MIRROR_MAX_FAILED_READS reads in a row fail, or if no answer text appears within
+    RESPONSE_MIRROR_FIRST_TEXT_TIMEOUT_SECONDS.
+
+    Args:
+        on_update: Called with (text, complete) whenever the text changed, and once more with
+                   complete=True when the answer is done (or following it stopped early).
+        timeout: Seconds to wait for the answer to complete before reporting what's there.
+
+    Returns:
+        The answer text (possibly partial), or None if no answer appeared.
+    """
+    selectors = RESPONSE_SELECTORS[service_name]
+    args = {**selectors, "quietMs": int(config.RESPONSE_COMPLETE_QUIET_SECONDS * 1000)}
+    last_text = ""
+    failed_reads = 0
+    started = time.monotonic()
+    deadline = started + timeout
+    first_text_deadline = started + min(timeout, config.RESPONSE_MIRROR_FIRST_TEXT_TIMEOUT_SECONDS)
+    while True:
+        text = last_text
+        stop_reason = None
+        if page.is_closed():
+            stop_reason = "the tab was closed"
+        else:
+            state = await page_helpers.run_page_helper(page, "responseState", args)
+            if state.get("ok"):
+                failed_reads = 0
+            else:
+                failed_reads += 1
+                logger.warning(f"Could not read {service_name} response state: {state.get('reason')}")
+            text = state.get("text") or last_text
+            if state.get("complete"):
+                logger.info(f"{service_name} answer complete ({len(text)} chars).")
+                await on_update(text, True)
+                return text
+            now = time.monotonic()
+            if failed_reads >= config.RESPONSE_MIRROR_MAX_FAILED_READS:
+                stop_reason = f"{failed_reads} reads in a row failed"
+            elif not text and now >= first_text_deadline:
+                stop_reason = f"no answer text after {now - started:.0f}s"
+            elif now >= deadline:
+                stop_reason = f"not complete after {timeout}s"
+        if stop_reason:
+            logger.warning(f"Stopped following {service_name} answer ({stop_reason}). Reporting {len(text)} chars so far.")
+            await on_update(text, True)
+            return text or None
+        if text != last_text:
+            await on_update(text, False)
+            last_text = text
+        await asyncio.sleep(config.RESPONSE_MIRROR_UPDATE_INTERVAL_SECONDS)
+
+async def connect_service(service_name: str) -> bool:
+    """
+    Connects to the service's Chrome instance over CDP and fills its page pool.
+
+    Used at startup and by the browser health monitor to reconnect after Chrome restarts.
+    On failure the service's entry is left empty so callers see it as unavailable.
+
+    Returns:
+        True if the service is connected.
+    """
+    service_config = config.AI_SERVICES[service_name]
+    port = service_config['port']
+    endpoint_url = f"http://localhost:{port}"
+    logger.info(f"Attempting to connect to {service_name} at {endpoint_url}...")
+
+    try:
+        browser = await _playwright_instance.chromium.connect_over_cdp(endpoint_url)
+        # Use the default context that comes with connect_over_cdp
+        context = browser.contexts[0]
+        if config.PLAYWRIGHT_PAGE_HELPERS_ENABLED:
+            await page_helpers.install_page_helpers(context)
+        # Reuse the already open tabs and open more until the pool is full
+        warmer = None
+        if config.PLAYWRIGHT_WARM_COMPOSERS_ENABLED and service_name in COMPOSER_PREPARERS:
+            warmer = lambda page: warm_composer(service_name, page)
+        pool = PagePool(service_name, context, service_config['url'], warmer=warmer)
+        await pool.fill(config.PLAYWRIGHT_PAGES_PER_SERVICE)
+
+        PLAYWRIGHT_INSTANCES[service_name] = {
+            "browser": browser, # Store browser to potentially disconnect later
+            "context": context,
+            "page": pool.pages[0],
+            "pool": pool,
+        }
+        logger.info(f"Successfully connected to {service_name} via CDP with {len(pool.pages)} tab(s).")
+        return True
+    except Exception as connect_error:
+        logger.error(f"Failed to connect to {service_name} at {endpoint_url}. Ensure Chrome is running with --remote-debugging-port={port}. Error: {connect_error}", exc_info=True)
+        PLAYWRIGHT_INSTANCES[service_name] = {"browser": None, "context": None, "page": None, "pool": None}
+        return False
+
+async def disconnect_service(service_name: str):
+    """Stops the service's page pool and closes its CDP connection, leaving its entry empty."""
+    instance_data = PLAYWRIGHT_INSTANCES.get(service_name, {})
+    pool = instance_data.get("pool")
+    if isinstance(pool, PagePool):
+        pool.close()
+    browser = instance_data.get("browser")
+    # Ensure it's a Browser object and check if connected
+    if isinstance(browser, Browser) and browser.is_connected():
+        try:
+            # Use close() to disconnect from a browser connected via CDP
+            await browser.close()
+            logger.info(f"Closed connection to browser for {service_name}")
+        except Exception as e:
+            logger.error(f"Error closing connection to browser for {service_name}: {e}", exc_info=e)
+    # Clear the entry regardless
+    PLAYWRIGHT_INSTANCES[service_name] = {"browser": None, "context": None, "page": None, "pool": None}
+
 async def initialize_playwright_connections():
     """
     Initializes Playwright and connects to the pre-launched Chrome instances
@@ -63,30 +402,10 @@ async def initialize_playwright_connections():
     connected_services = []
     try:
         _playwright_instance = await async_playwright().start()
-        chromium = _playwright_instance.chromium
-
-        for service_name, service_config in config.AI_SERVICES.items():
-            port = service_config['port']
-            endpoint_url = f"http://localhost:{port}"
-            logger.info(f"Attempting to connect to {service_name} at {endpoint_url}...")
 
-            try:
-                browser = await chromium.connect_over_cdp(endpoint_url)
-                # Use the default context that comes with connect_over_cdp
-                context = browser.contexts[0]
-                # Try to get the first available page, otherwise create one (less likely needed)
-                page = context.pages[0] if context.pages else await context.new_page()
-
-                PLAYWRIGHT_INSTANCES[service_name] = {
-                    "browser": browser, # Store browser to potentially disconnect later
-                    "context": context,
-                    "page": page
-                }
-                logger.info(f"Successfully connected to {service_name} via CDP.")
+        for service_name in config.AI_SERVICES:
+            if await connect_service(service_name):
                 connected_services.append(service_name.capitalize())
-            except Exception as connect_error:
-                logger.error(f"Failed to connect to {service_name} at {endpoint_url}. Ensure Chrome is running with --remote-debugging-port={port}. Error: {connect_error}", exc_info=True)
-                PLAYWRIGHT_INSTANCES[service_name] = {"browser": None, "context": None, "page": None}
 
         print("\n" + "="*50)
         print("PLAYWRIGHT CONNECTION STATUS")
@@ -114,18 +433,8 @@ async def close_playwright_connections():
     """Closes connections to browsers and stops the Playwright instance."""
     global _playwright_instance
     logger.info("Closing Playwright browser connections...")
-    for service_name, instance_data in list(PLAYWRIGHT_INSTANCES.items()):
-        browser = instance_data.get("browser")
-        # Ensure it's a Browser object and check if connected
-        if isinstance(browser, Browser) and browser.is_connected():
-            try:
-                # Use close() to disconnect from a browser connected via CDP
-                await browser.close()
-                logger.info(f"Closed connection to browser for {service_name}")
-            except Exception as e:
-                logger.error(f"Error closing connection to browser for {service_name}: {e}", exc_info=e)
-        # Clear the entry regardless
-        PLAYWRIGHT_INSTANCES[service_name] = {"browser": None, "context": None, "page": None}
+    for service_name in list(PLAYWRIGHT_INSTANCES):
+        await disconnect_service(service_name)
 
     if _playwright_instance:
         try:
@@ -149,6 +458,40 @@ def get_page_for_service(service_name: str) -> Optional[Page]:
     logger.warning(f"No active Playwright page found for service: {service_name}")
     return None
 
+async def lease_page(service_name: str) -> Optional[Page]:
+    """
+    Leases a tab from the service's page pool for exclusive use.
+
+    Waits up to PLAYWRIGHT_PAGE_LEASE_TIMEOUT_SECONDS when every tab is busy. Every leased
+    page must be handed back with release_page.
+
+    Returns:
+        The leased Page, or None if the service is not connected or no tab freed up in time.
+    """
+    pool = PLAYWRIGHT_INSTANCES.get(service_name, {}).get("pool")
+    if not isinstance(pool, PagePool):
+        logger.warning(f"No page pool available for service: {service_name}")
+        return None
+
+    if pool.idle_count == 0:
+        logger.info(f"All {len(pool.pages)} {service_name} tab(s) are busy. Waiting for one to be released...")
+    try:
+        return await pool.lease(timeout=config.PLAYWRIGHT_PAGE_LEASE_TIMEOUT_SECONDS)
+    except TimeoutError:
+        logger.error(f"Timed out after {config.PLAYWRIGHT_PAGE_LEASE_TIMEOUT_SECONDS}s waiting for a free {service_name} tab.")
+        return None
+    except Exception as e:
+        logger.error(f"Failed to lease a {service_name} tab: {e}", exc_info=True)
+        return None
+
+async def release_page(service_name: str, page: Page):
+    """Returns a tab previously obtained from lease_page to its service's pool."""
+    pool = PLAYWRIGHT_INSTANCES.get(service_name, {}).get("pool")
+    if not isinstance(pool, PagePool):
+        # Connections were closed while the page was leased; nothing to return it to.
+        return
+    await pool.release(page)
+
 async def take_screenshots():
     """Takes a screenshot of the current page for each connected service."""
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -172,51 +515,414 @@ async def take_screenshots():
     return saved_screenshots
 
 # --- Start New Screenshot Function (E10.T2) ---
-async def take_screenshot_for_service(
+# An element's bounding box in page (not viewport) coordinates
+_PAGE_BOX_SCRIPT = """
+element => {
+  const rect = element.getBoundingClientRect();
+  return { x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height };
+}
+"""
+
+async def capture_screenshot(
     service_name: str,
-    output_path: str
-) -> bool:
+    page: Optional[Page] = None,
+) -> Optional[bytes]:
     """
-    Takes a full-page screenshot of the specified service's current page state.
+    Captures the latest answer in the service's tab, in memory.
+
+    Only the answer element is captured (the viewport if there's no answer yet), encoded as
+    SCREENSHOT_FORMAT and re-encoded smaller if it exceeds SCREENSHOT_MAX_BYTES.
+    Answers taller than SCREENSHOT_MAX_HEIGHT_PX are captured from their top down to that height.
 
     Args:
         service_name: The name of the AI service (e.g., 'chatgpt', 'claude').
-        output_path: The full path where the screenshot PNG file should be saved.
+        page: The tab to capture, typically the one leased for the submission.
+              If None, the service's first tab is used.
 
     Returns:
-        True if the screenshot was successfully taken and saved, False otherwise.
+        The image bytes, or None if the screenshot failed.
     """
-    logger.info(f"Attempting full-page screenshot for {service_name}'s current page at {output_path}...")
-    page = get_page_for_service(service_name)
+    if page is None:
+        page = get_page_for_service(service_name)
 
     if not isinstance(page, Page):
         logger.error(f"Screenshot failed: Could not get a valid page for {service_name}.")
+        return None
+
+    image_options: Dict[str, Any] = {"type": config.SCREENSHOT_FORMAT, "timeout": 30000}
+    if config.SCREENSHOT_FORMAT == "jpeg":
+        image_options["quality"] = config.SCREENSHOT_JPEG_QUALITY
+
+    try:
+        answer = page.locator(RESPONSE_SELECTORS[service_name]["response"]).last
+        if await answer.count() == 0:
+            logger.info(f"No {service_name} answer found. Capturing the viewport...")
+            screenshot = await page.screenshot(**image_options)
+        else:
+            # Capture from the top of the answer down to the height cap. The clip is in page
+            # coordinates, and full_page lets it extend past the bottom of the viewport.
+            await answer.scroll_into_view_if_needed(timeout=5000)
+            await answer.evaluate("element => element.scrollIntoView({block: 'start'})")
+            box = await answer.evaluate(_PAGE_BOX_SCRIPT)
+            clip = {**box, "height": min(box["height"], config.SCREENSHOT_MAX_HEIGHT_PX)}
+            screenshot = await page.screenshot(full_page=True, clip=clip, **image_options)
+
+        if len(screenshot) > config.SCREENSHOT_MAX_BYTES:
+            screenshot = await asyncio.to_thread(screenshot_processing.shrink_to_cap, screenshot, config.SCREENSHOT_MAX_BYTES)
+        logger.info(f"Screenshot successful for {service_name} ({len(screenshot)} bytes).")
+        return screenshot
+    except PlaywrightTimeoutError:
+        logger.error(f"Screenshot failed: Timeout occurred while taking screenshot for {service_name}.", exc_info=True)
+        return None
+    except Exception as e:
+        logger.error(f"Screenshot failed: An unexpected error occurred for {service_name}: {e}", exc_info=True)
+        return None
+# --- End New Screenshot Function ---
+
+# --- Tab Feature State Cache ---
+# Last known model/toggle state per tab, so unchanged settings don't reopen menus on every submission.
+# The cache is tied to the loaded document through a token stored on `window`: a reload or a
+# navigation we didn't make drops the token, and the cached state is discarded and re-read from the UI.
+# Our own same-origin new chat navigations (open_new_chat_by_url) carry the state over to the new document.
+_FEATURE_STATE_TOKEN_PROPERTY = "__aiChorusFeatureStateToken"
+_tab_feature_states: "weakref.WeakKeyDictionary[Page, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+async def get_cached_features(page: Page) -> Dict[str, Any]:
+    """Returns the tab's cached feature state, or an empty dict if unknown or the page was reloaded."""
+    cached = _tab_feature_states.get(page)
+    if cached is None:
+        return {}
+    try:
+        token = await page.evaluate(f"() => window.{_FEATURE_STATE_TOKEN_PROPERTY} || null")
+    except Exception as e:
+        logger.warning(f"Could not read feature state token from tab: {e}")
+        token = None
+    if token != cached["token"]:
+        logger.info("Tab was reloaded since its feature state was cached. Re-checking settings in the UI.")
+        _tab_feature_states.pop(page, None)
+        return {}
+    return cached["features"]
+
+async def remember_features(page: Page, **features: Any):
+    """Records the state of one or more features after they were set or verified in the UI."""
+    cached = _tab_feature_states.get(page)
+    if cached is None:
+        token = uuid.uuid4().hex
+        try:
+            await page.evaluate(f"token => {{ window.{_FEATURE_STATE_TOKEN_PROPERTY} = token; }}", token)
+        except Exception as e:
+            logger.warning(f"Could not store feature state token on tab: {e}")
+            return
+        cached = {"token": token, "features": {}}
+        _tab_feature_states[page] = cached
+    cached["features"].update(features)
+
+async def carry_features_to_new_document(page: Page, features: Dict[str, Any]):
+    """Re-attaches feature state read before one of our own navigations to the newly loaded document."""
+    _tab_feature_states.pop(page, None)
+    if features:
+        await remember_features(page, **features)
+
+def forget_feature(page: Page, feature_name: str):
+    """Drops a feature from the cache after its state could not be confirmed."""
+    cached = _tab_feature_states.get(page)
+    if cached is not None:
+        cached["features"].pop(feature_name, None)
+# --- End Tab Feature State Cache ---
+
+# --- Warm Composers ---
+# Tabs whose composer was prepared in the background, mapped to the options they were prepared with.
+# Entries are consumed by the next submission on that tab.
+_warm_composers: "weakref.WeakKeyDictionary[Page, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+def _significant_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    # None means "leave as is", so it never makes a prepared composer unusable
+    return {key: value for key, value in options.items() if value is not None}
+
+async def warm_composer(service_name: str, page: Page) -> bool:
+    """
+    Prepares a tab for the next submission with the service's SERVICE_COMPOSER_OPTIONS:
+    opens a new chat and applies the model and toggles, leaving an empty composer.
+
+    Returns:
+        True if the composer is ready, False if preparation failed (the submission then prepares it itself).
+    """
+    _warm_composers.pop(page, None)
+    options = config.SERVICE_COMPOSER_OPTIONS.get(service_name, {})
+    try:
+        await COMPOSER_PREPARERS[service_name](page, **options, timer=StepTimer(f"{service_name}-warm"))
+    except Exception as e:
+        logger.warning(f"Could not prepare a warm {service_name} composer: {e}")
         return False
+    _warm_composers[page] = _significant_options(options)
+    logger.info(f"Warm {service_name} composer ready.")
+    return True
+
+async def take_warm_composer(service_name: str, page: Page, options: Dict[str, Any]) -> bool:
+    """
+    Consumes the tab's warm composer if it was prepared with `options` and is still empty.
 
+    Returns:
+        True if the submission can skip straight to filling in the prompt.
+    """
+    prepared_options = _warm_composers.pop(page, None)
+    if prepared_options is None:
+        return False
+    if prepared_options != _significant_options(options):
+        logger.info(f"Warm {service_name} composer was prepared with {prepared_options}, not {options}. Preparing again.")
+        return False
     try:
-        # Ensure the output directory exists
-        output_dir = os.path.dirname(output_path)
-        if not os.path.exists(output_dir):
-             try:
-                 os.makedirs(output_dir)
-                 logger.info(f"Created screenshot directory: {output_dir}")
-             except OSError as e:
-                 logger.error(f"Screenshot failed: Could not create directory {output_dir}: {e}")
-                 return False
-
-        # Take the full-page screenshot of the current page
-        logger.info(f"Taking full-page screenshot for {service_name}...")
-        await page.screenshot(path=output_path, full_page=True, timeout=30000)
-        logger.info(f"Screenshot successful for {service_name}: Saved to {output_path}")
-        return True
+        if config.PLAYWRIGHT_PAGE_HELPERS_ENABLED:
+            state = await page_helpers.run_page_helper(page, "composerState", {"input": COMPOSER_INPUT_SELECTORS[service_name]})
+            composer_usable = state.get("inputReady") and state.get("inputEmpty")
+        else:
+            input_area = page.locator(COMPOSER_INPUT_SELECTORS[service_name])
+            composer_usable = await input_area.is_visible() and not (await input_area.inner_text()).strip()
+        if composer_usable:
+            logger.info(f"Using warm {service_name} composer.")
+            return True
+    except Exception as e:
+        logger.warning(f"Could not check warm {service_name} composer: {e}")
+    logger.info(f"Warm {service_name} composer is no longer usable. Preparing again.")
+    return False
+# --- End Warm Composers ---
 
-    except PlaywrightTimeoutError:
-        logger.error(f"Screenshot failed: Timeout occurred while taking screenshot for {service_name} at {output_path}.", exc_info=True)
+async def insert_prompt(page: Page, input_area: Locator, input_selector: str, prompt: str):
+    """
+    Enters the prompt into the composer.
+
+    Short prompts use fill(). From PROMPT_FAST_INSERT_MIN_CHARS on, the whole text is inserted
+    in one operation (CDP Input.insertText or a synthetic paste, per PROMPT_FAST_INSERT_METHOD),
+    which editors handle as a single transaction instead of reprocessing the document as it grows.
+    Falls back to fill() if the editor didn't take the text.
+    """
+    if len(prompt) < config.PROMPT_FAST_INSERT_MIN_CHARS:
+        await input_area.fill(prompt)
+        return
+
+    start_time = time.perf_counter()
+    try:
+        if config.PROMPT_FAST_INSERT_METHOD == "paste":
+            result = await page_helpers.run_page_helper(page, "pasteText", {"input": input_selector, "text": prompt})
+            inserted_length = result.get("length", 0)
+        else:
+            await input_area.focus()
+            await page.keyboard.insert_text(prompt)
+            inserted_length = await input_area.evaluate("element => element.innerText.length")
+    except Exception as e:
+        logger.warning(f"Fast prompt insertion failed: {e}")
+        inserted_length = 0
+
+    # Editors normalize whitespace (e.g. newlines into paragraphs), so allow a little slack
+    if inserted_length >= len(prompt.strip()) * 0.9:
+        logger.info(f"Inserted {len(prompt)} character prompt via {config.PROMPT_FAST_INSERT_METHOD} in {time.perf_counter() - start_time:.2f}s.")
+        return
+    logger.warning(f"Fast insertion left {inserted_length} of {len(prompt)} characters in the composer. Falling back to fill().")
+    await input_area.fill(prompt)
+
+async def attach_long_prompt(page: Page, service_name: str, prompt: str, file_input_selector: str) -> str:
+    """
+    Attaches prompts of PROMPT_ATTACHMENT_MIN_CHARS or more as a text file through the upload input.
+
+    Returns:
+        The text to type into the composer: PROMPT_ATTACHMENT_INSTRUCTION if the prompt was
+        attached, otherwise the prompt itself (short prompt, no upload input, or upload failed).
+    """
+    if not config.PROMPT_ATTACHMENT_MIN_CHARS or len(prompt) < config.PROMPT_ATTACHMENT_MIN_CHARS:
+        return prompt
+    try:
+        file_input = page.locator(file_input_selector).first
+        if await file_input.count() == 0:
+            logger.warning(f"No {service_name} upload input found. Entering the {len(prompt)} character prompt as text.")
+            return prompt
+        await file_input.set_input_files(files=[{
+            "name": config.PROMPT_ATTACHMENT_FILENAME,
+            "mimeType": "text/plain",
+            "buffer": prompt.encode("utf-8"),
+        }])
+        logger.info(f"Attached {len(prompt)} character prompt to {service_name} as {config.PROMPT_ATTACHMENT_FILENAME}.")
+        return config.PROMPT_ATTACHMENT_INSTRUCTION
+    except Exception as e:
+        logger.warning(f"Could not attach prompt file to {service_name}: {e}. Entering the prompt as text.")
+        return prompt
+
+async def fill_and_submit_with_helper(page: Page, service_name: str, input_selector: str, submit_selector: str, prompt: str) -> bool:
+    """
+    Fills the composer and clicks send through the page helper script, in one round trip.
+
+    Returns:
+        True if the prompt was sent. False if helpers are disabled or the step failed before
+        sending, in which case the caller fills and submits with locators.
+    """
+    if not config.PLAYWRIGHT_PAGE_HELPERS_ENABLED:
         return False
+    result = await page_helpers.run_page_helper(
+        page, "fillAndSubmit", {"input": input_selector, "submit": submit_selector, "text": prompt}
+    )
+    if result.get("ok"):
+        logger.info(f"Filled and submitted {service_name} prompt via page helper.")
+        return True
+    logger.warning(f"Page helper could not fill and submit {service_name} prompt ({result.get('reason')}). Falling back to locators.")
+    return False
+
+async def open_new_chat_by_url(page: Page, url: str, input_selector: str) -> bool:
+    """
+    Navigates straight to a new chat URL and waits for the composer.
+
+    The full load would drop the tab's cached feature state, so the state is read first and
+    carried over when the new chat is on the same site: the settings it holds are account
+    preferences that survive the navigation, just as they survive clicking New Chat.
+
+    Returns:
+        True if the composer is ready, False if the navigation failed (callers fall back to clicking New Chat).
+    """
+    logger.info(f"Opening new chat at {url}...")
+    cached_features = await get_cached_features(page)
+    previous_origin = urlparse(page.url).netloc
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+        await expect(page.locator(input_selector)).to_be_visible(timeout=10000)
+        await carry_features_to_new_document(page, cached_features if urlparse(page.url).netloc == previous_origin else {})
+        return True
     except Exception as e:
-        logger.error(f"Screenshot failed: An unexpected error occurred for {service_name}: {e}", exc_info=True)
+        logger.warning(f"Could not open new chat at {url}: {e}. Falling back to the New Chat button.")
         return False
-# --- End New Screenshot Function ---
+
+async def prepare_composer_chatgpt(
+    page: Page,
+    model_suffix: Optional[str] = None,
+    enable_search: Optional[bool] = None,
+    enable_deep_research: Optional[bool] = None,
+    timer: Optional[StepTimer] = None,
+):
+    """
+    Opens a new ChatGPT chat and applies the model and feature toggles, leaving an empty composer.
+
+    Raises PlaywrightTimeoutError if the new chat or composer doesn't appear.
+    """
+    timer = timer or StepTimer("chatgpt")
+    # 0. Open a new chat, with the model in the URL if possible, else via the New Chat button
+    model_selected_by_url = False
+    new_chat_url = CHATGPT_NEW_CHAT_URL + (f"?{urlencode({'model': model_suffix})}" if model_suffix else "")
+    if config.PLAYWRIGHT_URL_FAST_PATH_ENABLED and await open_new_chat_by_url(page, new_chat_url, CHATGPT_INPUT_SELECTOR):
+        # ChatGPT drops the parameter from the URL when it doesn't accept the model
+        model_selected_by_url = bool(model_suffix) and f"model={model_suffix}" in page.url
+    else:
+        logger.info(f"Locating New Chat button: {CHATGPT_NEW_CHAT_BUTTON_SELECTOR}")
+        # Target the last matching button if multiple exist (common in some UI states)
+        new_chat_button = page.locator(CHATGPT_NEW_CHAT_BUTTON_SELECTOR).last
+        await expect(new_chat_button).to_be_visible(timeout=10000)
+        logger.info("New Chat button located. Clicking...")
+        await new_chat_button.click()
+        # Wait for the input area to be ready after clicking New Chat
+        logger.info(f"Waiting for input area ({CHATGPT_INPUT_SELECTOR}) to be visible after New Chat click...")
+        await expect(page.locator(CHATGPT_INPUT_SELECTOR)).to_be_visible(timeout=10000)
+    await expect(page.locator(CHATGPT_INPUT_SELECTOR)).to_be_editable(timeout=5000)
+    logger.info("Input area ready.")
+    timer.mark("new_chat")
+
+    cached_features = await get_cached_features(page)
+
+    # 1. (Optional) Select Model
+    if model_suffix:
+        model_switcher = page.locator(CHATGPT_MODEL_SWITCHER_SELECTOR).last
+        cached_model = cached_features.get("model")
+        if model_selected_by_url:
+            logger.info(f"Model '{model_suffix}' selected via new chat URL. Skipping model switcher.")
+            try:
+                await remember_features(page, model=(model_suffix, await model_switcher.inner_text(timeout=2000)))
+            except PlaywrightTimeoutError:
+                pass
+            model_suffix = None
+        elif cached_model and cached_model[0] == model_suffix:
+            # The switcher label shows the active model; if it's unchanged, so is the model
+            try:
+                if await model_switcher.inner_text(timeout=2000) == cached_model[1]:
+                    logger.info(f"Model '{model_suffix}' still selected (cached). Skipping model switcher.")
+                    model_suffix = None
+            except PlaywrightTimeoutError:
+                pass
+    if model_suffix:
+        logger.info(f"Attempting to select model with suffix: {model_suffix}")
+        try:
+            await expect(model_switcher).to_be_visible(timeout=10000)
+            logger.info("Model switcher located. Clicking...")
+            await model_switcher.click()
+
+            model_option_selector = CHATGPT_MODEL_OPTION_SELECTOR_TPL.format(model_suffix=model_suffix)
+            logger.info(f"Locating model option: {model_option_selector}")
+            model_option = page.locator(model_option_selector)
+            await expect(model_option).to_be_visible(timeout=7000)
+            logger.info(f"Model option '{model_suffix}' located. Clicking...")
+            await model_option.click()
+            # The menu closes once the selection has registered
+            await expect(model_option).to_be_hidden(timeout=3000)
+            logger.info(f"Successfully selected model: {model_suffix}")
+            await remember_features(page, model=(model_suffix, await model_switcher.inner_text(timeout=2000)))
+        except PlaywrightTimeoutError:
+            forget_feature(page, "model")
+            logger.warning(f"Could not find or click model option '{model_suffix}' within timeout. Continuing with default model.")
+        except Exception as model_err:
+             forget_feature(page, "model")
+             logger.warning(f"Error during model selection for '{model_suffix}': {model_err}. Continuing with default model.", exc_info=True)
+
+
+    timer.mark("select_model")
+
+    # 2. (Optional) Toggle Features (Search, Deep Research)
+    async def toggle_feature(feature_name: str, selector: str, desired_state: Optional[bool]):
+        if desired_state is None:
+            return # Don't change the toggle if desired_state is None
+        toggle_button = page.locator(selector)
+        if cached_features.get(feature_name) == desired_state:
+            # Known state: a single attribute read confirms it without waiting for visibility
+            try:
+                if await toggle_button.get_attribute("aria-pressed", timeout=1000) == str(desired_state).lower():
+                    logger.info(f"{feature_name} toggle still {'ON' if desired_state else 'OFF'} (cached).")
+                    return
+            except PlaywrightTimeoutError:
+                pass
+        logger.info(f"Checking {feature_name} toggle state (selector: {selector}). Desired: {desired_state}")
+        try:
+            await expect(toggle_button).to_be_visible(timeout=5000)
+            current_state_str = await toggle_button.get_attribute("aria-pressed")
+            current_state = current_state_str == "true"
+            logger.info(f"{feature_name} toggle current state: aria-pressed='{current_state_str}' (parsed as {current_state})")
+
+            if current_state != desired_state:
+                logger.info(f"{feature_name} toggle is {'ON' if current_state else 'OFF'}. Clicking to set to desired state: {'ON' if desired_state else 'OFF'}...")
+                await toggle_button.click()
+                # Wait for the attribute to change to confirm
+                await expect(toggle_button).to_have_attribute("aria-pressed", str(desired_state).lower(), timeout=3000)
+                logger.info(f"{feature_name} toggle is now {'ON' if desired_state else 'OFF'} (aria-pressed='{str(desired_state).lower()}').")
+            else:
+                 logger.info(f"{feature_name} toggle is already in the desired state {'ON' if desired_state else 'OFF'}.")
+            await remember_features(page, **{feature_name: desired_state})
+        except PlaywrightTimeoutError:
+            forget_feature(page, feature_name)
+            logger.warning(f"Timeout trying to find or interact with {feature_name} toggle ({selector}). State might not be as desired.")
+        except Exception as toggle_err:
+            forget_feature(page, feature_name)
+            logger.warning(f"Error interacting with {feature_name} toggle ({selector}): {toggle_err}. State might not be as desired.", exc_info=True)
+
+    toggles = [
+        {"name": "Search", "selector": CHATGPT_SEARCH_TOGGLE_SELECTOR, "desired": enable_search},
+        {"name": "Deep Research", "selector": CHATGPT_DEEP_RESEARCH_TOGGLE_SELECTOR, "desired": enable_deep_research},
+    ]
+    toggles = [toggle for toggle in toggles if toggle["desired"] is not None]
+    if toggles and config.PLAYWRIGHT_PAGE_HELPERS_ENABLED:
+        # Check and set every toggle in one page round trip
+        result = await page_helpers.run_page_helper(page, "setToggles", {"toggles": toggles})
+        confirmed_states = result.get("states", {})
+        if confirmed_states:
+            await remember_features(page, **confirmed_states)
+            logger.info(f"Toggles set via page helper: {confirmed_states}")
+        if not result.get("ok"):
+            logger.warning(f"Page helper could not set all toggles ({result.get('reason')}). Falling back to locators.")
+        toggles = [toggle for toggle in toggles if toggle["name"] not in confirmed_states]
+    for toggle in toggles:
+        await toggle_feature(toggle["name"], toggle["selector"], toggle["desired"])
+    timer.mark("toggles")
 
 async def submit_prompt_chatgpt(
     page: Page,
@@ -239,166 +945,121 @@ async def submit_prompt_chatgpt(
                               If None, the toggle state is not changed.
 
     Returns:
-        The URL of the new chat session, or None if an error occurred.
+        The URL of the new chat session.
+
+    Raises:
+        PlaywrightError (including PlaywrightTimeoutError) or any other error the submission
+        hit, so the caller's retry policy can tell retryable failures from fatal ones.
     """
     service_name = "chatgpt" # Hardcoded for this function
     logger.info(f"Starting ChatGPT submission for prompt: '{prompt[:50]}...'")
-    start_time = time.time()
+    timer = StepTimer(service_name)
+    url_watcher: Optional[ChatUrlWatcher] = None
 
     try:
-        # 0. Click New Chat button first to ensure clean state
-        logger.info(f"Locating New Chat button: {CHATGPT_NEW_CHAT_BUTTON_SELECTOR}")
-        # Target the last matching button if multiple exist (common in some UI states)
-        new_chat_button = page.locator(CHATGPT_NEW_CHAT_BUTTON_SELECTOR).last
-        await expect(new_chat_button).to_be_visible(timeout=10000)
-        logger.info("New Chat button located. Clicking...")
-        await new_chat_button.click()
-        # Wait for the input area to be ready after clicking New Chat
-        logger.info(f"Waiting for input area ({CHATGPT_INPUT_SELECTOR}) to be visible after New Chat click...")
-        await expect(page.locator(CHATGPT_INPUT_SELECTOR)).to_be_visible(timeout=10000)
-        logger.info("Input area ready.")
-        await page.wait_for_timeout(500) # Small pause after new chat is ready
-
-        # 1. (Optional) Select Model
-        if model_suffix:
-            logger.info(f"Attempting to select model with suffix: {model_suffix}")
-            model_switcher = page.locator(CHATGPT_MODEL_SWITCHER_SELECTOR).last
-            try:
-                await expect(model_switcher).to_be_visible(timeout=10000)
-                logger.info("Model switcher located. Clicking...")
-                await model_switcher.click()
-                await page.wait_for_timeout(300) # Wait for dropdown
-
-                model_option_selector = CHATGPT_MODEL_OPTION_SELECTOR_TPL.format(model_suffix=model_suffix)
-                logger.info(f"Locating model option: {model_option_selector}")
-                model_option = page.locator(model_option_selector)
-                await expect(model_option).to_be_visible(timeout=7000)
-                logger.info(f"Model option '{model_suffix}' located. Clicking...")
-                await model_option.click()
-                await page.wait_for_timeout(500) # Wait for selection to register
-                logger.info(f"Successfully selected model: {model_suffix}")
-            except PlaywrightTimeoutError:
-                logger.warning(f"Could not find or click model option '{model_suffix}' within timeout. Continuing with default model.")
-            except Exception as model_err:
-                 logger.warning(f"Error during model selection for '{model_suffix}': {model_err}. Continuing with default model.", exc_info=True)
-
-
-        # 2. (Optional) Toggle Features (Search, Deep Research)
-        async def toggle_feature(feature_name: str, selector: str, desired_state: Optional[bool]):
-            if desired_state is None:
-                return # Don't change the toggle if desired_state is None
-            logger.info(f"Checking {feature_name} toggle state (selector: {selector}). Desired: {desired_state}")
-            try:
-                toggle_button = page.locator(selector)
-                await expect(toggle_button).to_be_visible(timeout=5000)
-                current_state_str = await toggle_button.get_attribute("aria-pressed")
-                current_state = current_state_str == "true"
-                logger.info(f"{feature_name} toggle current state: aria-pressed='{current_state_str}' (parsed as {current_state})")
-
-                if current_state != desired_state:
-                    logger.info(f"{feature_name} toggle is {'ON' if current_state else 'OFF'}. Clicking to set to desired state: {'ON' if desired_state else 'OFF'}...")
-                    await toggle_button.click()
-                    # Wait for the attribute to change to confirm
-                    await expect(toggle_button).to_have_attribute("aria-pressed", str(desired_state).lower(), timeout=3000)
-                    logger.info(f"{feature_name} toggle is now {'ON' if desired_state else 'OFF'} (aria-pressed='{str(desired_state).lower()}').")
-                else:
-                     logger.info(f"{feature_name} toggle is already in the desired state {'ON' if desired_state else 'OFF'}.")
-                await page.wait_for_timeout(300) # Short pause after toggle action
-            except PlaywrightTimeoutError:
-                logger.warning(f"Timeout trying to find or interact with {feature_name} toggle ({selector}). State might not be as desired.")
-            except Exception as toggle_err:
-                logger.warning(f"Error interacting with {feature_name} toggle ({selector}): {toggle_err}. State might not be as desired.", exc_info=True)
-
-        # Toggle Search if requested
-        await toggle_feature("Search", CHATGPT_SEARCH_TOGGLE_SELECTOR, enable_search)
-        # Toggle Deep Research if requested
-        await toggle_feature("Deep Research", CHATGPT_DEEP_RESEARCH_TOGGLE_SELECTOR, enable_deep_research)
-
+        # 0-2. New chat, model and toggles (skipped if a warm composer was prepared in the background)
+        composer_options = {"model_suffix": model_suffix, "enable_search": enable_search, "enable_deep_research": enable_deep_research}
+        if await take_warm_composer(service_name, page, composer_options):
+            timer.mark("warm_composer")
+        else:
+            await prepare_composer_chatgpt(page, model_suffix, enable_search, enable_deep_research, timer)
 
-        # 3. Locate and fill the input area
-        logger.info(f"Locating input area: {CHATGPT_INPUT_SELECTOR}")
-        input_area = page.locator(CHATGPT_INPUT_SELECTOR)
-        await expect(input_area).to_be_visible(timeout=15000)
-        logger.info("Input area located. Filling with prompt...")
-        await input_area.fill(prompt)
-        await page.wait_for_timeout(500) # Give UI a moment
-
-        # 4. Locate the submit button (should be enabled now)
-        logger.info(f"Locating submit button: {CHATGPT_SUBMIT_BUTTON_SELECTOR}")
-        submit_button = page.locator(CHATGPT_SUBMIT_BUTTON_SELECTOR)
-        logger.info("Waiting for submit button to be visible...")
-        await expect(submit_button).to_be_visible(timeout=10000)
-        logger.info("Submit button is visible. Waiting for it to be enabled...")
-        await expect(submit_button).to_be_enabled(timeout=10000)
-        logger.info("Submit button located and enabled.")
-
-        # 5. Click submit
-        logger.info("Clicking submit button...")
-        await submit_button.click()
-
-        # 6. Wait for navigation to the new chat URL
+        # 3-5. Fill and submit in one page round trip, falling back to locators
+        url_watcher = ChatUrlWatcher(page, CHATGPT_CHAT_URL_REGEX)
+        composer_text = await attach_long_prompt(page, service_name, prompt, CHATGPT_FILE_INPUT_SELECTOR)
+        if len(composer_text) < config.PROMPT_FAST_INSERT_MIN_CHARS and await fill_and_submit_with_helper(page, service_name, CHATGPT_INPUT_SELECTOR, CHATGPT_SUBMIT_BUTTON_SELECTOR, composer_text):
+            timer.mark("submit")
+        else:
+            # 3. Locate and fill the input area
+            logger.info(f"Locating input area: {CHATGPT_INPUT_SELECTOR}")
+            input_area = page.locator(CHATGPT_INPUT_SELECTOR)
+            await expect(input_area).to_be_visible(timeout=15000)
+            logger.info("Input area located. Filling with prompt...")
+            await insert_prompt(page, input_area, CHATGPT_INPUT_SELECTOR, composer_text)
+            timer.mark("fill")
+
+            # 4. Locate the submit button (should be enabled now)
+            logger.info(f"Locating submit button: {CHATGPT_SUBMIT_BUTTON_SELECTOR}")
+            submit_button = page.locator(CHATGPT_SUBMIT_BUTTON_SELECTOR)
+            logger.info("Waiting for submit button to be visible...")
+            await expect(submit_button).to_be_visible(timeout=10000)
+            logger.info("Submit button is visible. Waiting for it to be enabled...")
+            await expect(submit_button).to_be_enabled(timeout=10000)
+            logger.info("Submit button located and enabled.")
+
+            # 5. Click submit
+            logger.info("Clicking submit button...")
+            await submit_button.click()
+            timer.mark("submit")
+
+        # 6. Capture the new chat URL as soon as the app navigates to it
         logger.info(f"Waiting for URL to match pattern: {CHATGPT_URL_PATTERN}...")
-        # Increased timeout for URL change as response generation can take time
-        await page.wait_for_url(CHATGPT_URL_PATTERN, timeout=60000) # Wait up to 60s for URL change
-        final_url = page.url
-        end_time = time.time()
-        logger.info(f"Successfully submitted to ChatGPT and captured URL: {final_url} (took {end_time - start_time:.2f}s)")
-        logger.info(f"ChatGPT submission completed in {time.time() - start_time:.2f} seconds. URL: {final_url}")
+        final_url = await url_watcher.wait(timeout=60)
+        if not final_url:
+            raise PlaywrightTimeoutError(f"ChatGPT did not navigate to a chat URL within 60s (current URL: {page.url})")
+        timer.mark("chat_url")
+        logger.info(f"ChatGPT submission completed: {timer.summary()}. URL: {final_url}")
         return final_url
 
     except PlaywrightTimeoutError as e:
-        logger.error(f"Timeout Error during ChatGPT submission: {e}", exc_info=True)
+        logger.error(f"Timeout Error during ChatGPT submission: {e}")
         # Try to capture URL even on timeout, might have partially worked
         current_url = page.url
         if CHATGPT_URL_PATTERN.replace("**","").replace("/**","") in current_url:
              logger.warning(f"Timeout occurred, but URL ({current_url}) seems to match pattern. Returning it.")
              return current_url
-        return None
+        raise
     except Exception as e:
-        logger.exception(f"An unexpected error occurred during ChatGPT submission: {e}", exc_info=True)
-        return None
+        # Tracebacks only for errors that aren't the browser or page failing
+        logger.error(f"An unexpected error occurred during ChatGPT submission: {e}", exc_info=not isinstance(e, (PlaywrightError, AssertionError)))
+        raise
+    finally:
+        if url_watcher:
+            url_watcher.stop()
 
-async def submit_prompt_claude(
+async def prepare_composer_claude(
     page: Page,
-    prompt: str,
     use_extended_thinking: bool = False,
-) -> Optional[str]:
+    timer: Optional[StepTimer] = None,
+):
     """
-    Submits a prompt to the Claude web UI using Playwright.
-
-    Args:
-        page: The Playwright Page object connected to Claude.
-        prompt: The text prompt to submit.
-        use_extended_thinking: If True, ensures the "Extended thinking" toggle is ON.
-                                If False (default), ensures it is OFF.
+    Opens a new Claude chat and sets the Extended thinking toggle, leaving an empty composer.
 
-    Returns:
-        The URL of the new chat session, or None if an error occurred.
+    Raises PlaywrightTimeoutError if the new chat, composer or tools popover doesn't appear.
     """
-    service_name = "claude" # Hardcoded for this function
-    logger.info(f"Starting Claude submission for prompt: '{prompt[:50]}...'")
-    start_time = time.time()
-
-    try:
-        # 1. Click New Chat button
+    timer = timer or StepTimer("claude")
+    # 1. Open a new chat via its URL, or click the New Chat button
+    input_area = page.locator(CLAUDE_TEXT_INPUT_SELECTOR)
+    if not (config.PLAYWRIGHT_URL_FAST_PATH_ENABLED and await open_new_chat_by_url(page, CLAUDE_NEW_CHAT_URL, CLAUDE_TEXT_INPUT_SELECTOR)):
         logger.info(f"Locating Claude New Chat button: {CLAUDE_NEW_CHAT_BUTTON_SELECTOR}")
         new_chat_button = page.locator(CLAUDE_NEW_CHAT_BUTTON_SELECTOR)
         await expect(new_chat_button).to_be_visible(timeout=10000)
         logger.info("Claude New Chat button located. Clicking...")
         await new_chat_button.click()
         logger.info(f"Waiting for Claude input area ({CLAUDE_TEXT_INPUT_SELECTOR}) to be visible after New Chat click...")
-        input_area = page.locator(CLAUDE_TEXT_INPUT_SELECTOR)
         await expect(input_area).to_be_visible(timeout=15000) # Increased wait slightly
-        logger.info("Claude input area ready.")
-        await page.wait_for_timeout(500)
-
+    logger.info("Claude input area ready.")
+    timer.mark("new_chat")
+
+    # 2-4. Extended thinking, skipped when the tab's cached state matches and the composer confirms it
+    cached_features = await get_cached_features(page)
+    thinking_confirmed = False
+    if cached_features.get("extended_thinking") == use_extended_thinking:
+        # One count() of the composer pill catches a manual toggle or a model change that reset thinking
+        indicator_shown = await page.locator(CLAUDE_EXTENDED_THINKING_INDICATOR_SELECTOR).count() > 0
+        thinking_confirmed = indicator_shown == use_extended_thinking
+        if not thinking_confirmed:
+            logger.info("Claude Extended Thinking indicator doesn't match the cached state. Re-checking in the tools popover.")
+            forget_feature(page, "extended_thinking")
+    if thinking_confirmed:
+        logger.info(f"Claude Extended Thinking still {use_extended_thinking} (cached, confirmed in composer). Skipping tools popover.")
+    else:
         # 2. Open Settings Popover & Check/Toggle Extended Thinking
         logger.info(f"Locating Claude settings button: {CLAUDE_SETTINGS_BUTTON_SELECTOR}")
         settings_button = page.locator(CLAUDE_SETTINGS_BUTTON_SELECTOR)
         await expect(settings_button).to_be_visible(timeout=10000)
         logger.info("Claude settings button located. Clicking to open popover...")
         await settings_button.click()
-        await page.wait_for_timeout(500) # Allow popover to animate
 
         logger.info(f"Locating Claude Extended Thinking toggle button: {CLAUDE_EXTENDED_THINKING_TOGGLE_BUTTON_SELECTOR}")
         extended_thinking_button = page.locator(CLAUDE_EXTENDED_THINKING_TOGGLE_BUTTON_SELECTOR)
@@ -417,40 +1078,146 @@ async def submit_prompt_claude(
             logger.info(f"Claude Extended Thinking toggle state successfully changed to {use_extended_thinking}.")
         else:
             logger.info(f"Claude Extended Thinking state is already the desired value ({use_extended_thinking}). No action needed.")
+        await remember_features(page, extended_thinking=use_extended_thinking)
 
         # 4. Close Settings Popover (Clicking input area)
         logger.info("Closing Claude popover by clicking input area...")
         await input_area.click() # Assumption: Clicking input closes popover
-        await page.wait_for_timeout(500)
+        try:
+            await expect(extended_thinking_button).to_be_hidden(timeout=3000)
+        except PlaywrightTimeoutError:
+            logger.warning("Claude popover still open after clicking input area. Pressing Escape...")
+            await page.keyboard.press("Escape")
+    timer.mark("extended_thinking")
 
-        # 5. Fill the input area
-        logger.info(f"Filling Claude input area with prompt: '{prompt[:50]}...'")
-        await input_area.fill(prompt)
-        await page.wait_for_timeout(500) # Pause after fill, was 1s in test script
-
-        # 6. Locate and click submit button
-        logger.info(f"Locating Claude submit button: {CLAUDE_SUBMIT_BUTTON_SELECTOR}")
-        submit_button = page.locator(CLAUDE_SUBMIT_BUTTON_SELECTOR)
-        logger.info("Waiting for Claude submit button to be enabled (no 'disabled' attribute)...")
-        await expect(submit_button).not_to_have_attribute("disabled", "", timeout=10000) # Check attribute absence
-        logger.info("Claude submit button located and enabled.")
-        logger.info("Clicking Claude submit button...")
-        await submit_button.click()
-
-        # 7. Wait for navigation to the new chat URL
+async def submit_prompt_claude(
+    page: Page,
+    prompt: str,
+    use_extended_thinking: bool = False,
+) -> Optional[str]:
+    """
+    Submits a prompt to the Claude web UI using Playwright.
+
+    Args:
+        page: The Playwright Page object connected to Claude.
+        prompt: The text prompt to submit.
+        use_extended_thinking: If True, ensures the "Extended thinking" toggle is ON.
+                                If False (default), ensures it is OFF.
+
+    Returns:
+        The URL of the new chat session.
+
+    Raises:
+        PlaywrightError (including PlaywrightTimeoutError) or any other error the submission
+        hit, so the caller's retry policy can tell retryable failures from fatal ones.
+    """
+    service_name = "claude" # Hardcoded for this function
+    logger.info(f"Starting Claude submission for prompt: '{prompt[:50]}...'")
+    timer = StepTimer(service_name)
+    url_watcher: Optional[ChatUrlWatcher] = None
+
+    try:
+        # 1-4. New chat and Extended thinking (skipped if a warm composer was prepared in the background)
+        if await take_warm_composer(service_name, page, {"use_extended_thinking": use_extended_thinking}):
+            timer.mark("warm_composer")
+        else:
+            await prepare_composer_claude(page, use_extended_thinking, timer)
+        input_area = page.locator(CLAUDE_TEXT_INPUT_SELECTOR)
+
+        # 5-6. Fill and submit in one page round trip, falling back to locators
+        url_watcher = ChatUrlWatcher(page, CLAUDE_CHAT_URL_REGEX)
+        composer_text = await attach_long_prompt(page, service_name, prompt, CLAUDE_FILE_INPUT_SELECTOR)
+        if len(composer_text) < config.PROMPT_FAST_INSERT_MIN_CHARS and await fill_and_submit_with_helper(page, service_name, CLAUDE_TEXT_INPUT_SELECTOR, CLAUDE_SUBMIT_BUTTON_SELECTOR, composer_text):
+            timer.mark("submit")
+        else:
+            # 5. Fill the input area
+            logger.info(f"Filling Claude input area with prompt: '{prompt[:50]}...'")
+            await insert_prompt(page, input_area, CLAUDE_TEXT_INPUT_SELECTOR, composer_text)
+            timer.mark("fill")
+
+            # 6. Locate and click submit button
+            logger.info(f"Locating Claude submit button: {CLAUDE_SUBMIT_BUTTON_SELECTOR}")
+            submit_button = page.locator(CLAUDE_SUBMIT_BUTTON_SELECTOR)
+            logger.info("Waiting for Claude submit button to be enabled (no 'disabled' attribute)...")
+            await expect(submit_button).not_to_have_attribute("disabled", "", timeout=10000) # Check attribute absence
+            logger.info("Claude submit button located and enabled.")
+            logger.info("Clicking Claude submit button...")
+            await submit_button.click()
+            timer.mark("submit")
+
+        # 7. Capture the new chat URL as soon as the app navigates to it
         logger.info(f"Waiting for Claude URL to match pattern: {CLAUDE_CHAT_URL_PATTERN}")
-        # Use a long timeout as response generation can take time, esp. w/ extended thinking
-        await page.wait_for_url(CLAUDE_CHAT_URL_PATTERN, timeout=90000)
-        final_url = page.url
-        logger.info(f"Claude submission completed in {time.time() - start_time:.2f} seconds. URL: {final_url}")
+        final_url = await url_watcher.wait(timeout=90)
+        if not final_url:
+            raise PlaywrightTimeoutError(f"Claude did not navigate to a chat URL within 90s (current URL: {page.url})")
+        timer.mark("chat_url")
+        logger.info(f"Claude submission completed: {timer.summary()}. URL: {final_url}")
         return final_url
 
     except PlaywrightTimeoutError as e:
-        logger.error(f"Playwright TimeoutError during Claude submission: {e}", exc_info=True)
-        return None
+        logger.error(f"Playwright TimeoutError during Claude submission: {e}")
+        raise
     except Exception as e:
-        logger.exception(f"An unexpected error occurred during Claude submission: {e}", exc_info=True)
-        return None
+        # Tracebacks only for errors that aren't the browser or page failing
+        logger.error(f"An unexpected error occurred during Claude submission: {e}", exc_info=not isinstance(e, (PlaywrightError, AssertionError)))
+        raise
+    finally:
+        if url_watcher:
+            url_watcher.stop()
+
+async def prepare_composer_gemini(
+    page: Page,
+    timer: Optional[StepTimer] = None,
+):
+    """
+    Opens a new Gemini chat (when the New Chat button is available), leaving an empty composer.
+
+    Raises PlaywrightTimeoutError if the composer doesn't appear.
+    """
+    timer = timer or StepTimer("gemini")
+    # 1. Ensure New Chat State (Optional but recommended)
+    try:
+        logger.info(f"Checking for Gemini New Chat button: {GEMINI_NEW_CHAT_BUTTON_SELECTOR}")
+        new_chat_button = page.locator(GEMINI_NEW_CHAT_BUTTON_SELECTOR)
+        # Try waiting for it briefly, but don't fail if it doesn't appear
+        try:
+             await new_chat_button.wait_for(state='visible', timeout=1000) # Very short wait
+        except PlaywrightTimeoutError:
+             pass # Ignore timeout
+
+        # Now check if it's actually visible *without* raising an error
+        if await new_chat_button.is_visible():
+            logger.info("Gemini New Chat button visible and enabled. Clicking...")
+            await new_chat_button.click()
+            logger.info(f"Waiting for Gemini input area ({GEMINI_TEXT_INPUT_SELECTOR}) to be visible after clicking new chat...")
+            await expect(page.locator(GEMINI_TEXT_INPUT_SELECTOR)).to_be_visible(timeout=10000)
+            logger.info("Gemini input area ready after new chat click.")
+        else:
+            logger.info("Gemini New Chat button not found or not visible. Assuming current state is new chat ready.")
+            # Still wait for input area to be ready in this case too
+            logger.info(f"Waiting for Gemini input area ({GEMINI_TEXT_INPUT_SELECTOR}) to be visible...")
+            await expect(page.locator(GEMINI_TEXT_INPUT_SELECTOR)).to_be_visible(timeout=10000)
+            logger.info("Gemini input area ready.")
+
+    except Exception as e_nc:
+         # Catch any other unexpected error during the new chat check
+         logger.error(f"Error during New Chat check: {e_nc}. Proceeding, assuming new chat state.", exc_info=True)
+         logger.info(f"Waiting for Gemini input area ({GEMINI_TEXT_INPUT_SELECTOR}) to be visible...")
+         await expect(page.locator(GEMINI_TEXT_INPUT_SELECTOR)).to_be_visible(timeout=10000)
+         logger.info("Gemini input area ready.")
+
+    timer.mark("new_chat")
+
+COMPOSER_PREPARERS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "chatgpt": prepare_composer_chatgpt,
+    "claude": prepare_composer_claude,
+    "gemini": prepare_composer_gemini,
+}
+COMPOSER_INPUT_SELECTORS = {
+    "chatgpt": CHATGPT_INPUT_SELECTOR,
+    "claude": CLAUDE_TEXT_INPUT_SELECTOR,
+    "gemini": GEMINI_TEXT_INPUT_SELECTOR,
+}
 
 async def submit_prompt_gemini(
     page: Page,
@@ -464,79 +1231,72 @@ async def submit_prompt_gemini(
         prompt: The text prompt to submit.
 
     Returns:
-        The URL of the new chat session, or None if an error occurred.
+        The URL of the new chat session.
+
+    Raises:
+        PlaywrightError (including PlaywrightTimeoutError) or any other error the submission
+        hit, so the caller's retry policy can tell retryable failures from fatal ones.
     """
     service_name = "gemini" # Hardcoded for this function
     logger.info(f"Starting Gemini submission for prompt: '{prompt[:50]}...'")
-    start_time = time.time()
+    timer = StepTimer(service_name)
+    url_watcher: Optional[ChatUrlWatcher] = None
 
     try:
-        # 1. Ensure New Chat State (Optional but recommended)
-        try:
-            logger.info(f"Checking for Gemini New Chat button: {GEMINI_NEW_CHAT_BUTTON_SELECTOR}")
-            new_chat_button = page.locator(GEMINI_NEW_CHAT_BUTTON_SELECTOR)
-            # Try waiting for it briefly, but don't fail if it doesn't appear
-            try:
-                 await new_chat_button.wait_for(state='visible', timeout=1000) # Very short wait
-            except PlaywrightTimeoutError:
-                 pass # Ignore timeout
-
-            # Now check if it's actually visible *without* raising an error
-            if await new_chat_button.is_visible():
-                logger.info("Gemini New Chat button visible and enabled. Clicking...")
-                await new_chat_button.click()
-                logger.info(f"Waiting for Gemini input area ({GEMINI_TEXT_INPUT_SELECTOR}) to be visible after clicking new chat...")
-                await expect(page.locator(GEMINI_TEXT_INPUT_SELECTOR)).to_be_visible(timeout=10000)
-                logger.info("Gemini input area ready after new chat click.")
-            else:
-                logger.info("Gemini New Chat button not found or not visible. Assuming current state is new chat ready.")
-                # Still wait for input area to be ready in this case too
-                logger.info(f"Waiting for Gemini input area ({GEMINI_TEXT_INPUT_SELECTOR}) to be visible...")
-                await expect(page.locator(GEMINI_TEXT_INPUT_SELECTOR)).to_be_visible(timeout=10000)
-                logger.info("Gemini input area ready.")
-
-        except Exception as e_nc:
-             # Catch any other unexpected error during the new chat check
-             logger.error(f"Error during New Chat check: {e_nc}. Proceeding, assuming new chat state.", exc_info=True)
-             logger.info(f"Waiting for Gemini input area ({GEMINI_TEXT_INPUT_SELECTOR}) to be visible...")
-             await expect(page.locator(GEMINI_TEXT_INPUT_SELECTOR)).to_be_visible(timeout=10000)
-             logger.info("Gemini input area ready.")
-
-        await page.wait_for_timeout(500) # Small pause after ensuring state
-
-        # 2. Locate and fill the input area
-        logger.info(f"Locating Gemini input area: {GEMINI_TEXT_INPUT_SELECTOR}")
-        input_area = page.locator(GEMINI_TEXT_INPUT_SELECTOR)
-        logger.info("Gemini input area located. Filling with prompt...")
-        await input_area.fill(prompt)
-        await page.wait_for_timeout(500) # Pause after fill
-
-        # 3. Locate and wait for the submit button to be enabled
-        logger.info(f"Locating enabled Gemini submit button: {GEMINI_SUBMIT_BUTTON_ENABLED_SELECTOR}")
-        submit_button = page.locator(GEMINI_SUBMIT_BUTTON_ENABLED_SELECTOR)
-        await expect(submit_button).to_be_enabled(timeout=10000) # Wait specifically for enabled state
-        logger.info("Gemini submit button located and enabled.")
-
-        # 4. Click submit
-        logger.info("Clicking Gemini submit button...")
-        await submit_button.click()
-
-        # 5. Wait for "thinking" indicator to appear
-        logger.info(f"Waiting for Gemini thinking element ({GEMINI_THINKING_INDICATOR_SELECTOR}) to become visible...")
-        # Use .first because there might be multiple responses/thoughts on the page eventually
-        thinking_element = page.locator(GEMINI_THINKING_INDICATOR_SELECTOR).first
-        await thinking_element.wait_for(state='visible', timeout=90000) # Wait up to 90s
-        logger.info("Gemini thinking element is visible.")
-
-        # 6. Capture URL now that thinking has started (and URL likely updated)
-        final_url = page.url
-        logger.info(f"Gemini submission completed in {time.time() - start_time:.2f} seconds. URL: {final_url}")
+        # 1. Ensure New Chat State (skipped if a warm composer was prepared in the background)
+        if await take_warm_composer(service_name, page, {}):
+            timer.mark("warm_composer")
+        else:
+            await prepare_composer_gemini(page, timer)
+
+        # 2-4. Fill and submit in one page round trip, falling back to locators
+        url_watcher = ChatUrlWatcher(page, GEMINI_CHAT_URL_REGEX)
+        if len(prompt) < config.PROMPT_FAST_INSERT_MIN_CHARS and await fill_and_submit_with_helper(page, service_name, GEMINI_TEXT_INPUT_SELECTOR, GEMINI_SUBMIT_BUTTON_ENABLED_SELECTOR, prompt):
+            timer.mark("submit")
+        else:
+            # 2. Locate and fill the input area
+            logger.info(f"Locating Gemini input area: {GEMINI_TEXT_INPUT_SELECTOR}")
+            input_area = page.locator(GEMINI_TEXT_INPUT_SELECTOR)
+            logger.info("Gemini input area located. Filling with prompt...")
+            await insert_prompt(page, input_area, GEMINI_TEXT_INPUT_SELECTOR, prompt)
+            timer.mark("fill")
+
+            # 3. Locate and wait for the submit button to be enabled
+            logger.info(f"Locating enabled Gemini submit button: {GEMINI_SUBMIT_BUTTON_ENABLED_SELECTOR}")
+            submit_button = page.locator(GEMINI_SUBMIT_BUTTON_ENABLED_SELECTOR)
+            await expect(submit_button).to_be_enabled(timeout=10000) # Wait specifically for enabled state
+            logger.info("Gemini submit button located and enabled.")
+
+            # 4. Click submit
+            logger.info("Clicking Gemini submit button...")
+            await submit_button.click()
+            timer.mark("submit")
+
+        # 5. Capture the conversation URL as soon as the app navigates to it
+        logger.info(f"Waiting for Gemini conversation URL ({GEMINI_CHAT_URL_REGEX.pattern})...")
+        final_url = await url_watcher.wait(timeout=90)
+        if not final_url:
+            # 6. Fall back to the URL at the time the "thinking" indicator is showing
+            logger.warning("Gemini URL didn't change to a conversation route. Checking for the thinking element...")
+            # Use .first because there might be multiple responses/thoughts on the page eventually
+            thinking_element = page.locator(GEMINI_THINKING_INDICATOR_SELECTOR).first
+            await thinking_element.wait_for(state='visible', timeout=5000)
+            logger.info("Gemini thinking element is visible.")
+            final_url = page.url
+            if final_url == url_watcher.start_url:
+                # No new chat was opened, so the prompt went into the conversation the tab was on
+                logger.warning(f"Gemini answered in the tab's existing conversation ({final_url}).")
+        timer.mark("chat_url")
+        logger.info(f"Gemini submission completed: {timer.summary()}. URL: {final_url}")
         return final_url
 
     except PlaywrightTimeoutError as e:
-        logger.error(f"Playwright TimeoutError during Gemini submission: {e}", exc_info=True)
-        # Consider adding screenshot capture here too
-        return None
+        logger.error(f"Playwright TimeoutError during Gemini submission: {e}")
+        raise
     except Exception as e:
-        logger.exception(f"An unexpected error occurred during Gemini submission: {e}", exc_info=True)
-        return None 
\ No newline at end of file
+        # Tracebacks only for errors that aren't the browser or page failing
+        logger.error(f"An unexpected error occurred during Gemini submission: {e}", exc_info=not isinstance(e, (PlaywrightError, AssertionError)))
+        raise
+    finally:
+        if url_watcher:
+            url_watcher.stop() 
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Retry policy for AI submissions: failure classification, exponential backoff with jitter, and a shared deadline."""
+
+import asyncio
+import random
+from typing import Optional
+
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from . import config
+
+# Failure classes
+RETRYABLE = "retryable"  # May succeed on the next attempt (slow page, interrupted navigation)
+FATAL = "fatal"          # Will fail the same way again (tab or browser gone, bug in our code)
+
+# Playwright errors meaning the tab or the browser connection is gone
+_FATAL_PLAYWRIGHT_MESSAGES = (
+    "has been closed",
+    "Target closed",
+    "Browser closed",
+    "Connection closed",
+)
+
+def classify_error(error: BaseException) -> str:
+    """
+    Decides whether a failed submission attempt is worth retrying.
+
+    Timeouts, failed `expect` assertions (raised as AssertionError when the UI doesn't reach the
+    expected state in time) and transient Playwright errors (navigations destroying the execution
+    context, detached elements, network errors) are retryable. Closed tabs and lost browser
+    connections are fatal, as is anything else.
+    """
+    if isinstance(error, (PlaywrightTimeoutError, TimeoutError, AssertionError)):
+        return RETRYABLE
+    if isinstance(error, PlaywrightError):
+        message = str(error)
+        if any(fatal_message in message for fatal_message in _FATAL_PLAYWRIGHT_MESSAGES):
+            return FATAL
+        return RETRYABLE
+    return FATAL
+
+def describe_error(error: BaseException) -> str:
+    """First line of the error message (Playwright appends long call logs), for logs and Slack."""
+    message = str(error).strip()
+    return message.splitlines()[0] if message else type(error).__name__
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Seconds to wait after the given (1-based) failed attempt.
+
+    Doubles from SUBMISSION_RETRY_BASE_DELAY_SECONDS up to SUBMISSION_RETRY_MAX_DELAY_SECONDS;
+    the actual delay is drawn from the upper half of that, so concurrent retries spread out.
+    """
+    delay = min(config.SUBMISSION_RETRY_MAX_DELAY_SECONDS, config.SUBMISSION_RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def new_deadline(seconds: Optional[float] = None) -> float:
+    """Returns an event loop time `seconds` from now (SUBMISSION_DEADLINE_SECONDS by default), for asyncio.timeout_at."""
+    if seconds is None:
+        seconds = config.SUBMISSION_DEADLINE_SECONDS
+    return asyncio.get_running_loop().time() + seconds
+
+def time_left(deadline: float) -> float:
+    """Seconds until the deadline (negative once it has passed)."""
+    return deadline - asyncio.get_running_loop().time()
+
+def can_retry(attempt: int, delay: float, deadline: float) -> bool:
+    """Returns True if another attempt is allowed and would still have SUBMISSION_MIN_ATTEMPT_SECONDS after the delay."""
+    return attempt < config.SUBMISSION_MAX_ATTEMPTS and time_left(deadline) - delay >= config.SUBMISSION_MIN_ATTEMPT_SECONDS
@@ -0,0 +1,95 @@
+"""Screenshot post-processing (size capping, side-by-side collage) built on Pillow (optional dependency)."""
+
+import io
+import logging
+from typing import List, Optional, Tuple
+
+from . import config
+
+try:
+    # Optional dependency: `uv pip install pillow` enables downscaling and collages
+    from PIL import Image, ImageDraw
+except ImportError:
+    Image = None
+    ImageDraw = None
+
+logger = logging.getLogger(__name__)
+
+_COLLAGE_GAP_PX = 16
+_COLLAGE_LABEL_HEIGHT_PX = 28
+_MIN_JPEG_QUALITY = 30
+
+def pillow_available() -> bool:
+    """Returns True if Pillow is installed."""
+    return Image is not None
+
+def _encode(image: "Image.Image", quality: int) -> bytes:
+    output = io.BytesIO()
+    if config.SCREENSHOT_FORMAT == "jpeg":
+        image.convert("RGB").save(output, format="JPEG", quality=quality, optimize=True)
+    else:
+        image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+def _encode_within_cap(image: "Image.Image", max_bytes: int) -> bytes:
+    """Encodes the image, lowering JPEG quality and then halving the size until it fits `max_bytes`."""
+    quality = config.SCREENSHOT_JPEG_QUALITY
+    data = _encode(image, quality)
+    while len(data) > max_bytes:
+        if config.SCREENSHOT_FORMAT == "jpeg" and quality > _MIN_JPEG_QUALITY:
+            quality = max(_MIN_JPEG_QUALITY, quality - 15)
+        elif min(image.size) > 200:
+            image = image.resize((image.width // 2, image.height // 2), Image.LANCZOS)
+        else:
+            break
+        data = _encode(image, quality)
+    return data
+
+def shrink_to_cap(screenshot: bytes, max_bytes: int) -> bytes:
+    """
+    Re-encodes a screenshot that is larger than `max_bytes` until it fits.
+
+    Returns the screenshot unchanged if it already fits or Pillow isn't installed.
+    """
+    if len(screenshot) <= max_bytes or not pillow_available():
+        return screenshot
+    with Image.open(io.BytesIO(screenshot)) as image:
+        image.load()
+        shrunk = _encode_within_cap(image, max_bytes)
+    logger.info(f"Shrunk screenshot from {len(screenshot)} to {len(shrunk)} bytes.")
+    return shrunk
+
+def make_collage(screenshots: List[Tuple[str, bytes]]) -> Optional[bytes]:
+    """
+    Combines labelled screenshots side by side into a single image.
+
+    Every screenshot is scaled to the height of the shortest one (at most
+    SCREENSHOT_COLLAGE_MAX_HEIGHT_PX), with its label above it.
+
+    Returns:
+        The encoded collage within SCREENSHOT_MAX_BYTES, or None if Pillow isn't installed
+        or the images couldn't be combined.
+    """
+    if not pillow_available():
+        logger.warning("Cannot build screenshot collage: Pillow is not installed.")
+        return None
+    try:
+        images = [Image.open(io.BytesIO(screenshot)).convert("RGB") for _, screenshot in screenshots]
+        height = min(config.SCREENSHOT_COLLAGE_MAX_HEIGHT_PX, *(image.height for image in images))
+        scaled = [image.resize((max(1, image.width * height // image.height), height), Image.LANCZOS) for image in images]
+
+        width = sum(image.width for image in scaled) + _COLLAGE_GAP_PX * (len(scaled) - 1)
+        collage = Image.new("RGB", (width, height + _COLLAGE_LABEL_HEIGHT_PX), "white")
+        draw = ImageDraw.Draw(collage)
+        x = 0
+        for (label, _), image in zip(screenshots, scaled):
+            draw.text((x + 8, 8), label, fill="black")
+            collage.paste(image, (x, _COLLAGE_LABEL_HEIGHT_PX))
+            x += image.width + _COLLAGE_GAP_PX
+
+        data = _encode_within_cap(collage, config.SCREENSHOT_MAX_BYTES)
+        logger.info(f"Built {collage.width}x{collage.height} collage of {len(images)} screenshots ({len(data)} bytes).")
+        return data
+    except Exception as e:
+        logger.error(f"Failed to build screenshot collage: {e}", exc_info=True)
+        return None
@@ -1,10 +1,13 @@
+import asyncio
 import logging
-import os # Added for screenshot file operations
-from slack_sdk import WebClient
+import tempfile
+import time
+import aiohttp
 from slack_sdk.web.async_client import AsyncWebClient # Import Async client
 from slack_sdk.errors import SlackApiError
+from slack_sdk.http_retry.builtin_async_handlers import AsyncRateLimitErrorRetryHandler
 from slack_sdk.signature import SignatureVerifier
-from typing import Optional, Dict, Any, Tuple, List
+from typing import Optional, Dict, Any, Tuple, List, BinaryIO, NamedTuple
 import httpx
 
 from . import config  # Use relative import within the app package
@@ -12,14 +15,28 @@ from . import config  # Use relative import within the app package
 logger = logging.getLogger(__name__)
 
 # Initialize Slack Signature Verifier and Web Client
-# These are initialized once when the module is loaded.
+# These are initialized once at application startup (see main.lifespan).
 signature_verifier: Optional[SignatureVerifier] = None
-slack_client: Optional[WebClient] = None
+slack_client: Optional[AsyncWebClient] = None
 bot_user_id: Optional[str] = None
-
-def initialize_slack_clients():
-    """Initializes Slack clients using configuration values."""
-    global signature_verifier, slack_client
+# Shared aiohttp session so every Slack API call reuses keep-alive connections
+_slack_http_session: Optional[aiohttp.ClientSession] = None
+# Shared httpx client for file downloads (connection pool + TLS session reuse)
+_download_client: Optional[httpx.AsyncClient] = None
+
+class AudioTooLargeError(Exception):
+    """Raised when an audio file exceeds AUDIO_DOWNLOAD_MAX_BYTES."""
+
+class AudioFileInfo(NamedTuple):
+    """Download details of an audio attachment."""
+    url: str
+    name: str
+    mimetype: str
+    file_id: Optional[str]
+
+async def initialize_slack_clients():
+    """Initializes Slack clients using configuration values. Must run inside the event loop."""
+    global signature_verifier, slack_client, _slack_http_session, _download_client
     if config.SLACK_SIGNING_SECRET:
         signature_verifier = SignatureVerifier(config.SLACK_SIGNING_SECRET)
         logger.info("Slack SignatureVerifier initialized.")
@@ -27,19 +44,50 @@ def initialize_slack_clients():
         logger.warning("Slack SignatureVerifier not initialized due to missing secret.")
 
     if config.SLACK_BOT_TOKEN:
-        slack_client = WebClient(token=config.SLACK_BOT_TOKEN)
-        logger.info("Slack WebClient initialized.")
+        connector = aiohttp.TCPConnector(
+            limit=config.SLACK_HTTP_MAX_CONNECTIONS,
+            keepalive_timeout=config.SLACK_HTTP_KEEPALIVE_SECONDS,
+        )
+        _slack_http_session = aiohttp.ClientSession(connector=connector)
+        slack_client = AsyncWebClient(token=config.SLACK_BOT_TOKEN, session=_slack_http_session)
+        # Retry once after the Retry-After delay when Slack answers 429
+        slack_client.retry_handlers.append(AsyncRateLimitErrorRetryHandler(max_retry_count=1))
+        logger.info("Slack AsyncWebClient initialized with a shared connection pool.")
+
+        _download_client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {config.SLACK_BOT_TOKEN}"},
+            limits=httpx.Limits(
+                max_connections=config.SLACK_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=config.SLACK_HTTP_KEEPALIVE_SECONDS,
+            ),
+            timeout=config.AUDIO_DOWNLOAD_TIMEOUT_SECONDS,
+            follow_redirects=True,
+        )
+        logger.info("Slack file download client initialized.")
     else:
-        logger.warning("Slack WebClient not initialized due to missing token.")
-
-def fetch_bot_user_id():
+        logger.warning("Slack AsyncWebClient not initialized due to missing token.")
+
+async def close_slack_clients():
+    """Closes the shared Slack HTTP session and download client."""
+    global slack_client, _slack_http_session, _download_client
+    if _slack_http_session and not _slack_http_session.closed:
+        await _slack_http_session.close()
+        logger.info("Slack HTTP session closed.")
+    if _download_client:
+        await _download_client.aclose()
+        logger.info("Slack file download client closed.")
+    _slack_http_session = None
+    _download_client = None
+    slack_client = None
+
+async def fetch_bot_user_id():
     """Fetches and stores the bot's user ID."""
     global bot_user_id
     if not slack_client:
         logger.error("Slack client not initialized. Cannot fetch bot user ID.")
         return
     try:
-        response = slack_client.auth_test()
+        response = await slack_client.auth_test()
         bot_user_id = response.get("user_id")
         logger.info(f"Successfully fetched bot user ID: {bot_user_id}")
     except SlackApiError as e:
@@ -111,12 +159,10 @@ def should_process_event(event: Dict[str, Any]) -> bool:
             logger.info(f"Ignoring message: Does not meet processing criteria (subtype: {subtype}, has_files: {bool(files)}, has_text: {bool(text)}).")
         return False
 
-def extract_audio_file_info(files: List[Dict[str, Any]]) -> Optional[Tuple[str, str, str]]:
-    """Finds the first audio file and returns its download URL, name, and mimetype."""
-    if not files:
-        return None
-
-    for file_info in files:
+def extract_audio_files_info(files: List[Dict[str, Any]]) -> List[AudioFileInfo]:
+    """Finds every downloadable audio file and returns their download URL, name, mimetype and Slack file ID, in attachment order."""
+    audio_files = []
+    for file_info in files or []:
         mimetype = file_info.get("mimetype", "")
         filetype = file_info.get("filetype", "")
         logger.debug(f"Checking file - ID: {file_info.get('id')}, Type: {filetype}, Mimetype: {mimetype}")
@@ -125,61 +171,205 @@ def extract_audio_file_info(files: List[Dict[str, Any]]) -> Optional[Tuple[str,
             name = file_info.get("name", "audio_file.bin") # Provide a default name
             if url:
                 logger.info(f"Found audio file for download: {name}")
-                return url, name, mimetype
-    logger.info("No downloadable audio file found in the files list.")
-    return None
+                audio_files.append(AudioFileInfo(url, name, mimetype, file_info.get("id")))
+    if not audio_files:
+        logger.info("No downloadable audio file found in the files list.")
+    return audio_files
+
+async def download_slack_audio(url: str) -> Optional[BinaryIO]:
+    """
+    Streams an audio file from Slack into a spooled temporary file.
+
+    The file stays in memory up to AUDIO_DOWNLOAD_SPOOL_THRESHOLD_BYTES and rolls over to disk
+    beyond that. Files larger than AUDIO_DOWNLOAD_MAX_BYTES are rejected as soon as the size is known.
 
-async def download_slack_audio(url: str) -> Optional[bytes]:
-    """Downloads audio file content from Slack using the bot token."""
-    if not config.SLACK_BOT_TOKEN:
-        logger.error("Cannot download audio: SLACK_BOT_TOKEN not configured.")
+    Returns:
+        The downloaded file, rewound to the start, or None on failure. The caller must close it.
+
+    Raises:
+        AudioTooLargeError: If the file exceeds AUDIO_DOWNLOAD_MAX_BYTES.
+    """
+    if not config.SLACK_BOT_TOKEN or not _download_client:
+        logger.error("Cannot download audio: SLACK_BOT_TOKEN not configured or download client not initialized.")
         return None
 
     logger.info(f"Attempting to download audio from {url[:50]}...")
+    audio_file = tempfile.SpooledTemporaryFile(max_size=config.AUDIO_DOWNLOAD_SPOOL_THRESHOLD_BYTES)
     try:
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"Bearer {config.SLACK_BOT_TOKEN}"}
-            response = await client.get(url, headers=headers, timeout=30.0)
+        async with _download_client.stream("GET", url) as response:
             response.raise_for_status()
-            audio_bytes = await response.aread()
-            logger.info(f"Successfully downloaded {len(audio_bytes)} bytes of audio data.")
-            return audio_bytes
+
+            # Reject early when Slack tells us the size up front
+            content_length = int(response.headers.get("Content-Length") or 0)
+            if content_length > config.AUDIO_DOWNLOAD_MAX_BYTES:
+                raise AudioTooLargeError(f"Audio file is {content_length} bytes, over the {config.AUDIO_DOWNLOAD_MAX_BYTES} byte limit.")
+
+            downloaded_bytes = 0
+            async for chunk in response.aiter_bytes():
+                downloaded_bytes += len(chunk)
+                if downloaded_bytes > config.AUDIO_DOWNLOAD_MAX_BYTES:
+                    raise AudioTooLargeError(f"Audio file exceeded the {config.AUDIO_DOWNLOAD_MAX_BYTES} byte limit while downloading.")
+                audio_file.write(chunk)
+
+        if downloaded_bytes == 0:
+            logger.error("Downloaded audio file is empty.")
+            audio_file.close()
+            return None
+
+        audio_file.seek(0)
+        logger.info(f"Successfully downloaded {downloaded_bytes} bytes of audio data.")
+        return audio_file
+    except AudioTooLargeError as e:
+        logger.error(f"Rejected audio download: {e}")
+        audio_file.close()
+        raise
     except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error downloading audio file: {e.response.status_code} - {e.response.text}")
+        logger.error(f"HTTP error downloading audio file: {e.response.status_code}")
+        audio_file.close()
         return None # Indicate download failure
     except httpx.RequestError as e:
-         logger.error(f"Network error downloading audio file: {e}")
-         return None # Indicate download failure
+        logger.error(f"Network error downloading audio file: {e}")
+        audio_file.close()
+        return None # Indicate download failure
     except Exception as e:
         logger.error(f"Unexpected error during audio download: {e}", exc_info=True)
+        audio_file.close()
         return None # Indicate download failure
 
-def post_message(channel_id: str, thread_ts: str, text: str):
-    """Posts a message to a Slack channel/thread."""
+async def post_message(channel_id: str, thread_ts: str, text: str) -> Optional[str]:
+    """Posts a message to a Slack channel/thread. Returns the new message's ts, or None on failure."""
     if not slack_client:
         logger.error("Cannot post message: Slack client not initialized.")
-        return
+        return None
 
     try:
-        response = slack_client.chat_postMessage(
+        response = await slack_client.chat_postMessage(
             channel=channel_id,
             text=text,
-            thread_ts=thread_ts
+            thread_ts=thread_ts,
+            unfurl_links=False,
+            unfurl_media=False
         )
         logger.info(f"Successfully posted reply to thread {thread_ts}")
+        return response.get("ts")
     except SlackApiError as e:
         logger.error(f"Error posting Slack message: {e.response['error']}")
     except Exception as e:
         logger.error(f"An unexpected error occurred posting Slack message: {e}")
+    return None
 
-def post_summary_reply(channel_id: str, thread_ts: str, results: Dict[str, Any]):
-    """Posts a formatted summary of the processing results back to the Slack thread using Block Kit."""
+class _EditPacer:
+    """
+    Spaces chat.update calls across every message the app edits.
+
+    chat.update is rate limited per workspace, and the progressive summary and every mirrored
+    answer share that limit, so edits are handed evenly spaced slots of SLACK_EDITS_PER_MINUTE.
+    """
+
+    def __init__(self, edits_per_minute: float):
+        self.min_gap = 60.0 / edits_per_minute
+        self._next_slot = 0.0
+
+    async def acquire(self, wait: bool = True) -> bool:
+        """Waits for the next free slot. With wait=False, returns False at once if none is free now."""
+        now = time.monotonic()
+        if not wait and now < self._next_slot:
+            return False
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.min_gap
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        return True
+
+    def back_off(self, error: SlackApiError):
+        """Holds every edit back for Slack's Retry-After delay if the error is a rate limit."""
+        if error.response.status_code != 429 and error.response.get("error") != "ratelimited":
+            return
+        headers = error.response.headers or {}
+        retry_after = float(headers.get("Retry-After") or headers.get("retry-after") or 30)
+        self._next_slot = max(self._next_slot, time.monotonic() + retry_after)
+        logger.warning(f"Slack rate-limited message edits. Pausing edits for {retry_after:.0f}s.")
+
+_edit_pacer = _EditPacer(config.SLACK_EDITS_PER_MINUTE)
+
+async def update_message(channel_id: str, message_ts: str, text: str, wait: bool = True) -> bool:
+    """
+    Replaces the text of a message posted earlier.
+
+    Edits are paced with every other edit the app makes. With wait=False the edit is skipped
+    (returning False) instead of waiting for a free slot.
+
+    Returns:
+        True if the message was updated.
+    """
     if not slack_client:
-        logger.error("Cannot post summary reply: Slack client not initialized.")
-        return
+        logger.error("Cannot update message: Slack client not initialized.")
+        return False
+    if not await _edit_pacer.acquire(wait):
+        return False
 
-    logger.info(f"Posting summary reply (Block Kit) to thread {thread_ts} in channel {channel_id}")
+    try:
+        await slack_client.chat_update(channel=channel_id, ts=message_ts, text=text)
+        return True
+    except SlackApiError as e:
+        _edit_pacer.back_off(e)
+        logger.error(f"Error updating Slack message {message_ts}: {e.response['error']}")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred updating Slack message {message_ts}: {e}")
+    return False
+
+class MirroredMessage:
+    """
+    A thread reply that mirrors changing text (e.g. a streaming answer) by editing itself in place.
+
+    The message is posted on the first update. Later updates are sent at most once per
+    `min_interval` seconds, and only while the shared edit budget allows; updates held back are
+    carried by the next one that goes through, and a final update is always sent.
+    """
 
+    def __init__(self, channel_id: str, thread_ts: str, min_interval: float):
+        self.channel_id = channel_id
+        self.thread_ts = thread_ts
+        self.min_interval = min_interval
+        self.message_ts: Optional[str] = None
+        self._sent_text: Optional[str] = None
+        self._last_sent_at = 0.0
+
+    async def update(self, text: str, final: bool = False):
+        if text == self._sent_text:
+            return
+        if not final and time.monotonic() - self._last_sent_at < self.min_interval:
+            return
+        if self.message_ts is None:
+            self.message_ts = await post_message(self.channel_id, self.thread_ts, text)
+            sent = self.message_ts is not None
+        else:
+            # Intermediate edits give way when the shared edit budget is used up
+            sent = await update_message(self.channel_id, self.message_ts, text, wait=final)
+        if sent:
+            self._sent_text = text
+            self._last_sent_at = time.monotonic()
+
+def escape_mrkdwn(text: str) -> str:
+    """Escapes &, < and > so text is shown as written instead of as links, mentions or HTML."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def build_summary_blocks(
+    results: Dict[str, Any],
+    thread_ts: str,
+    pending: Optional[List[str]] = None,
+) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Builds the Block Kit summary of the processing results.
+
+    Args:
+        results: Links, transcript, original text and errors collected so far.
+        thread_ts: The parent message ts (used for unique button action IDs).
+        pending: Names of the steps still running (e.g. "Transcript", "ChatGPT"), shown as a waiting line.
+
+    Returns:
+        (blocks, fallback_text) for chat.postMessage / chat.update.
+    """
     blocks = []
     actions_elements = [] # To hold buttons
 
@@ -286,13 +476,13 @@ def post_summary_reply(channel_id: str, thread_ts: str, results: Dict[str, Any])
             "type": "mrkdwn",
             "text": f":warning: *Claude Error:* _{claude_error}_"
         })
-    # Add transcript error here ONLY if there was also original text (otherwise it's in the main section)
     if gemini_error:
         error_elements.append({
             "type": "mrkdwn",
             "text": f":warning: *Gemini Error:* _{gemini_error}_"
         })
-    if transcript_error and original_text:
+    # Add transcript error here ONLY if there was also original text or a partial transcript (otherwise it's in the main section)
+    if transcript_error and (original_text or transcript):
          error_elements.append({
             "type": "mrkdwn",
             "text": f":warning: *Transcription Failed:* _{transcript_error}_"
@@ -305,7 +495,16 @@ def post_summary_reply(channel_id: str, thread_ts: str, results: Dict[str, Any])
         })
 
 
-    # --- 5. Post the Message ---
+    # --- 5. Add a waiting line for steps still in progress ---
+    if pending:
+        blocks.append({
+            "type": "context",
+            "elements": [{
+                "type": "mrkdwn",
+                "text": f":hourglass_flowing_sand: Waiting for {', '.join(pending)}…"
+            }]
+        })
+
     # Fallback text for notifications
     fallback_text = "AI Chorus results:"
     if transcript: fallback_text += f" Transcript: {transcript[:50]}..."
@@ -313,14 +512,23 @@ def post_summary_reply(channel_id: str, thread_ts: str, results: Dict[str, Any])
     if chatgpt_url: fallback_text += " (ChatGPT Link)"
     if claude_url: fallback_text += " (Claude Link)"
     if gemini_url: fallback_text += " (Gemini Link)"
+    return blocks, fallback_text
+
+async def post_summary_reply(channel_id: str, thread_ts: str, results: Dict[str, Any]):
+    """Posts a formatted summary of the processing results back to the Slack thread using Block Kit."""
+    if not slack_client:
+        logger.error("Cannot post summary reply: Slack client not initialized.")
+        return
 
+    logger.info(f"Posting summary reply (Block Kit) to thread {thread_ts} in channel {channel_id}")
+    blocks, fallback_text = build_summary_blocks(results, thread_ts)
 
     if not blocks:
         logger.warning(f"No blocks generated for summary reply in thread {thread_ts}. Skipping post.")
         return
 
     try:
-        response = slack_client.chat_postMessage(
+        response = await slack_client.chat_postMessage(
             channel=channel_id,
             thread_ts=thread_ts,
             text=fallback_text,  # Fallback text for notifications
@@ -336,64 +544,125 @@ def post_summary_reply(channel_id: str, thread_ts: str, results: Dict[str, Any])
     except Exception as e:
         logger.error(f"An unexpected error occurred posting Slack Block Kit summary reply: {e}", exc_info=True)
 
+class SummaryMessage:
+    """
+    The thread's results summary, posted as a placeholder right away and edited in place as results arrive.
+
+    Updates are coalesced: the first one posts the message, later ones are sent at most once per
+    `min_interval` seconds, carrying whatever the latest state is by then. A final update is sent
+    immediately.
+    """
+
+    def __init__(self, channel_id: str, thread_ts: str, min_interval: float):
+        self.channel_id = channel_id
+        self.thread_ts = thread_ts
+        self.min_interval = min_interval
+        self.message_ts: Optional[str] = None
+        self._latest: Optional[Tuple[List[Dict[str, Any]], str]] = None
+        self._sent: Optional[Tuple[List[Dict[str, Any]], str]] = None
+        self._last_sent_at = 0.0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+
+    async def update(self, results: Dict[str, Any], pending: Optional[List[str]] = None, final: bool = False):
+        """Records the current results and sends them now (first or final update) or soon after (otherwise)."""
+        self._latest = build_summary_blocks(results, self.thread_ts, pending)
+        if final:
+            if self._flush_task:
+                self._flush_task.cancel()
+                self._flush_task = None
+            await self._send()
+        elif self.message_ts is None:
+            await self._send()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._send_after_interval())
+
+    async def _send_after_interval(self):
+        delay = self.min_interval - (time.monotonic() - self._last_sent_at)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._flush_task = None
+        await self._send()
+
+    async def _send(self):
+        async with self._send_lock:
+            if not slack_client or self._latest is None or self._latest == self._sent:
+                return
+            blocks, fallback_text = self._latest
+            if not blocks:
+                return
+            try:
+                if self.message_ts is None:
+                    response = await slack_client.chat_postMessage(
+                        channel=self.channel_id,
+                        thread_ts=self.thread_ts,
+                        text=fallback_text,
+                        blocks=blocks,
+                        unfurl_links=False,
+                        unfurl_media=False
+                    )
+                    self.message_ts = response.get("ts")
+                    logger.info(f"Posted summary placeholder to thread {self.thread_ts}")
+                else:
+                    await _edit_pacer.acquire()
+                    await slack_client.chat_update(channel=self.channel_id, ts=self.message_ts, text=fallback_text, blocks=blocks)
+                    logger.info(f"Updated summary in thread {self.thread_ts}")
+                self._sent = (blocks, fallback_text)
+                self._last_sent_at = time.monotonic()
+            except SlackApiError as e:
+                _edit_pacer.back_off(e)
+                logger.error(f"Error sending Slack summary for thread {self.thread_ts}: {e.response['error']}")
+            except Exception as e:
+                logger.error(f"An unexpected error occurred sending Slack summary for thread {self.thread_ts}: {e}", exc_info=True)
+
 # --- Start New Screenshot Upload Function (E10.T3) ---
-async def upload_screenshot_to_thread(
+async def upload_screenshots_to_thread(
     channel_id: str,
     thread_ts: str,
-    file_path: str,
+    screenshots: List[Tuple[str, bytes]],
     initial_comment: str
 ) -> bool:
     """
-    Uploads a screenshot file to a specific Slack thread using the Async client.
+    Uploads several screenshots to a Slack thread as a single message, in one files_upload_v2 call.
 
     Args:
         channel_id: The ID of the channel containing the thread.
         thread_ts: The timestamp of the parent message of the thread.
-        file_path: The local path to the screenshot file to upload.
-        initial_comment: The text comment to post along with the file.
+        screenshots: (filename, image bytes) pairs.
+        initial_comment: The text comment to post along with the files.
 
     Returns:
-        True if the file was uploaded successfully, False otherwise.
+        True if every file was uploaded, False otherwise.
     """
-    # Use the async client for this async function
-    async_slack_client = AsyncWebClient(token=config.SLACK_BOT_TOKEN)
-
-    if not async_slack_client.token:
-        logger.error("Cannot upload screenshot: Async Slack client could not be initialized (missing token).")
-        return False
-
-    if not os.path.exists(file_path):
-        logger.error(f"Cannot upload screenshot: File not found at {file_path}")
+    if not slack_client:
+        logger.error("Cannot upload screenshots: Slack client not initialized.")
         return False
 
-    file_name = os.path.basename(file_path)
-    logger.info(f"Uploading screenshot {file_name} to thread {thread_ts} in channel {channel_id} (using async client)...")
+    file_names = [file_name for file_name, _ in screenshots]
+    logger.info(f"Uploading {len(screenshots)} screenshot(s) {file_names} to thread {thread_ts} in channel {channel_id}...")
 
     try:
-        # Use files_upload_v2 method with await
-        response = await async_slack_client.files_upload_v2(
+        response = await slack_client.files_upload_v2(
             channel=channel_id,
             thread_ts=thread_ts,
-            file=file_path,
             initial_comment=initial_comment,
-            title=file_name # Use filename as title
+            file_uploads=[
+                {"file": content, "filename": file_name, "title": file_name}
+                for file_name, content in screenshots
+            ],
         )
-        if response.get("ok") and response.get("files") and len(response.get("files", [])) > 0:
-            uploaded_file_info = response["files"][0] # Get info about the first (and likely only) uploaded file
-            logger.info(f"Successfully uploaded screenshot: {uploaded_file_info.get('name')}, ID: {uploaded_file_info.get('id')} to thread {thread_ts}")
+        uploaded_files = response.get("files") or []
+        if response.get("ok") and len(uploaded_files) == len(screenshots):
+            logger.info(f"Successfully uploaded screenshots {[uploaded.get('id') for uploaded in uploaded_files]} to thread {thread_ts}")
             return True
         else:
             error_msg = response.get("error", "unknown error")
-            logger.error(f"Slack API error uploading screenshot {file_name}: {error_msg}. Response: {response}")
+            logger.error(f"Slack API error uploading screenshots {file_names}: {error_msg}. Response: {response}")
             return False
     except SlackApiError as e:
-        logger.error(f"Slack API error during screenshot upload {file_name}: {e.response['error']}", exc_info=True)
-        return False
-    except FileNotFoundError:
-        # This shouldn't happen due to the check above, but handle defensively
-        logger.error(f"File not found during upload attempt for {file_path}")
+        logger.error(f"Slack API error during screenshot upload {file_names}: {e.response['error']}", exc_info=True)
         return False
     except Exception as e:
-        logger.error(f"Unexpected error uploading screenshot {file_name}: {e}", exc_info=True)
+        logger.error(f"Unexpected error uploading screenshots {file_names}: {e}", exc_info=True)
         return False
 # --- End New Screenshot Upload Function --- 
\ No newline at end of file
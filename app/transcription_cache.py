@@ -0,0 +1,187 @@
+"""Content-addressed cache of transcripts, with an in-memory LRU tier and an on-disk tier."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import BinaryIO, Dict, List, Optional
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+# Slack file IDs are alphanumeric; anything else is stripped before use in a file name
+_UNSAFE_FILE_ID_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+# content hash -> transcript (most recently used last)
+_memory_cache: "OrderedDict[str, str]" = OrderedDict()
+# Slack file ID -> content hash (most recently used last), so re-shared files are found without
+# downloading them again. Bounded like the transcripts; evicted IDs are still found via their .ref file
+_file_id_index: "OrderedDict[str, str]" = OrderedDict()
+
+cache_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+def _transcript_path(content_hash: str) -> str:
+    return os.path.join(config.TRANSCRIPTION_CACHE_DIR, f"{content_hash}.txt")
+
+def _file_id_ref_path(file_id: str) -> str:
+    return os.path.join(config.TRANSCRIPTION_CACHE_DIR, f"file_{_UNSAFE_FILE_ID_CHARS.sub('', file_id)}.ref")
+
+def _remember_in_memory(content_hash: str, transcript: str):
+    _memory_cache[content_hash] = transcript
+    _memory_cache.move_to_end(content_hash)
+    while len(_memory_cache) > config.TRANSCRIPTION_CACHE_MEMORY_ENTRIES:
+        _memory_cache.popitem(last=False)
+
+def _remember_file_id(file_id: str, content_hash: str):
+    _file_id_index[file_id] = content_hash
+    _file_id_index.move_to_end(file_id)
+    while len(_file_id_index) > config.TRANSCRIPTION_CACHE_MEMORY_ENTRIES:
+        _file_id_index.popitem(last=False)
+
+def _read_from_disk(content_hash: str) -> Optional[str]:
+    path = _transcript_path(content_hash)
+    try:
+        with open(path, "r", encoding="utf-8") as transcript_file:
+            transcript = transcript_file.read()
+        os.utime(path) # Mark as recently used for eviction
+        return transcript
+    except FileNotFoundError:
+        return None
+
+def _read_file_id_ref(file_id: str) -> Optional[str]:
+    try:
+        with open(_file_id_ref_path(file_id), "r", encoding="utf-8") as ref_file:
+            return ref_file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def _remove_file_id_ref(file_id: str):
+    try:
+        os.remove(_file_id_ref_path(file_id))
+    except FileNotFoundError:
+        pass
+
+def _write_to_disk(content_hash: str, transcript: str, file_id: Optional[str]):
+    os.makedirs(config.TRANSCRIPTION_CACHE_DIR, exist_ok=True)
+    with open(_transcript_path(content_hash), "w", encoding="utf-8") as transcript_file:
+        transcript_file.write(transcript)
+    if file_id:
+        with open(_file_id_ref_path(file_id), "w", encoding="utf-8") as ref_file:
+            ref_file.write(content_hash)
+    _evict_disk_entries()
+
+def _evict_disk_entries():
+    """Deletes the least recently used transcripts until the disk tier fits TRANSCRIPTION_CACHE_MAX_DISK_BYTES."""
+    entries = []
+    ref_paths = []
+    total_bytes = 0
+    with os.scandir(config.TRANSCRIPTION_CACHE_DIR) as scan:
+        for entry in scan:
+            if entry.is_file() and entry.name.endswith(".txt"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+            elif entry.is_file() and entry.name.endswith(".ref"):
+                ref_paths.append(entry.path)
+
+    evicted = False
+    for _, size, path in sorted(entries):
+        if total_bytes <= config.TRANSCRIPTION_CACHE_MAX_DISK_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+        evicted = True
+        cache_stats["evictions"] += 1
+        logger.info(f"Evicted cached transcript {os.path.basename(path)} from disk.")
+
+    if evicted:
+        _remove_stale_file_id_refs(ref_paths)
+
+def _remove_stale_file_id_refs(ref_paths: List[str]):
+    """Deletes file ID refs whose transcript is no longer on disk."""
+    for ref_path in ref_paths:
+        try:
+            with open(ref_path, "r", encoding="utf-8") as ref_file:
+                content_hash = ref_file.read().strip()
+            if not content_hash or not os.path.exists(_transcript_path(content_hash)):
+                os.remove(ref_path)
+        except FileNotFoundError:
+            pass
+
+async def hash_audio_file(audio_file: BinaryIO) -> str:
+    """Returns the SHA-256 of an audio file object's content, leaving it rewound."""
+    def compute() -> str:
+        digest = hashlib.sha256()
+        audio_file.seek(0)
+        for chunk in iter(lambda: audio_file.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+        audio_file.seek(0)
+        return digest.hexdigest()
+    return await asyncio.to_thread(compute)
+
+async def get_by_hash(content_hash: str) -> Optional[str]:
+    """Returns the cached transcript for the given audio content hash, checking memory then disk."""
+    if not config.TRANSCRIPTION_CACHE_ENABLED:
+        return None
+    return await _lookup(content_hash, count_miss=True)
+
+async def _lookup(content_hash: str, count_miss: bool) -> Optional[str]:
+    transcript = _memory_cache.get(content_hash)
+    if transcript is not None:
+        _memory_cache.move_to_end(content_hash)
+        cache_stats["memory_hits"] += 1
+        logger.info(f"Transcription cache hit (memory) for {content_hash[:12]}.")
+        return transcript
+
+    transcript = await asyncio.to_thread(_read_from_disk, content_hash)
+    if transcript is not None:
+        _remember_in_memory(content_hash, transcript)
+        cache_stats["disk_hits"] += 1
+        logger.info(f"Transcription cache hit (disk) for {content_hash[:12]}.")
+        return transcript
+
+    if count_miss:
+        cache_stats["misses"] += 1
+    return None
+
+async def get_by_file_id(file_id: Optional[str]) -> Optional[str]:
+    """Returns the cached transcript for a Slack file that was transcribed before, without downloading it."""
+    if not config.TRANSCRIPTION_CACHE_ENABLED or not file_id:
+        return None
+
+    content_hash = _file_id_index.get(file_id) or await asyncio.to_thread(_read_file_id_ref, file_id)
+    # Misses aren't counted here: the content hash lookup that follows a miss records the outcome
+    if content_hash is None:
+        return None
+    _remember_file_id(file_id, content_hash)
+    transcript = await _lookup(content_hash, count_miss=False)
+    if transcript is None:
+        # The transcript was evicted; forget the stale reference in memory and on disk
+        _file_id_index.pop(file_id, None)
+        await asyncio.to_thread(_remove_file_id_ref, file_id)
+    return transcript
+
+async def store(content_hash: str, transcript: str, file_id: Optional[str] = None):
+    """Caches a transcript under its audio content hash (and Slack file ID, if known)."""
+    if not config.TRANSCRIPTION_CACHE_ENABLED:
+        return
+
+    _remember_in_memory(content_hash, transcript)
+    if file_id:
+        _remember_file_id(file_id, content_hash)
+    cache_stats["stores"] += 1
+    try:
+        await asyncio.to_thread(_write_to_disk, content_hash, transcript, file_id)
+    except OSError as e:
+        logger.error(f"Failed to write transcript {content_hash[:12]} to the disk cache: {e}")
+
+def get_cache_stats() -> Dict[str, int]:
+    """Returns hit/miss counters and the number of transcripts and file IDs held in memory."""
+    return {**cache_stats, "memory_entries": len(_memory_cache), "file_id_entries": len(_file_id_index)}
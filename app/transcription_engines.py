@@ -0,0 +1,174 @@
+"""Transcription engines (OpenAI Whisper API, local CPU Whisper) and per-file engine selection."""
+
+import asyncio
+import io
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Optional
+
+from . import audio_processing, config, openai_handler
+
+try:
+    # Optional dependency: `uv pip install faster-whisper` enables the local engine
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+logger = logging.getLogger(__name__)
+
+class TranscriptionEngine(ABC):
+    """A backend that turns an audio file into text."""
+
+    name: str
+    display_name: str
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Returns True if the engine is configured and its dependencies are present."""
+
+    @abstractmethod
+    async def transcribe(self, audio_file: BinaryIO, filename: str, mimetype: str) -> Optional[str]:
+        """Returns the transcript, or None if transcription failed."""
+
+    async def close(self):
+        """Releases any resources held by the engine."""
+
+class OpenAIWhisperEngine(TranscriptionEngine):
+    """The OpenAI Whisper API, with chunked parallel uploads for long recordings."""
+
+    name = "openai"
+    display_name = "OpenAI API"
+
+    def is_available(self) -> bool:
+        return openai_handler.openai_client is not None
+
+    async def transcribe(self, audio_file: BinaryIO, filename: str, mimetype: str) -> Optional[str]:
+        return await openai_handler.transcribe_audio_chunked(audio_file, filename, mimetype)
+
+class LocalWhisperEngine(TranscriptionEngine):
+    """
+    A Whisper-family model (faster-whisper / CTranslate2) running on the local CPU.
+
+    Works offline once the model files are on disk: point LOCAL_WHISPER_MODEL at a model
+    directory, or let faster-whisper download the named model once into LOCAL_WHISPER_DOWNLOAD_ROOT.
+    Transcriptions run one at a time on a dedicated thread so they don't starve the event loop.
+    """
+
+    name = "local"
+    display_name = "local Whisper"
+
+    def __init__(self):
+        self._model = None
+        self._model_lock = asyncio.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-whisper")
+
+    def is_available(self) -> bool:
+        return WhisperModel is not None
+
+    def _load_model(self):
+        logger.info(f"Loading local Whisper model '{config.LOCAL_WHISPER_MODEL}' ({config.LOCAL_WHISPER_COMPUTE_TYPE} on CPU)...")
+        return WhisperModel(
+            config.LOCAL_WHISPER_MODEL,
+            device="cpu",
+            compute_type=config.LOCAL_WHISPER_COMPUTE_TYPE,
+            cpu_threads=config.LOCAL_WHISPER_CPU_THREADS,
+            download_root=config.LOCAL_WHISPER_DOWNLOAD_ROOT,
+            local_files_only=config.LOCAL_WHISPER_OFFLINE,
+        )
+
+    async def load(self):
+        """Loads the model on the engine's thread if it isn't loaded yet."""
+        async with self._model_lock:
+            if self._model is None:
+                loop = asyncio.get_running_loop()
+                self._model = await loop.run_in_executor(self._executor, self._load_model)
+                logger.info("Local Whisper model loaded.")
+
+    def _transcribe_sync(self, audio_bytes: bytes) -> str:
+        # A thread can't be cancelled from the event loop, so the time limit is enforced here,
+        # between segments (each covers at most 30s of audio), and the thread is freed for the next file
+        deadline = time.monotonic() + config.LOCAL_TRANSCRIPTION_TIMEOUT_SECONDS
+        segments, info = self._model.transcribe(io.BytesIO(audio_bytes), beam_size=config.LOCAL_WHISPER_BEAM_SIZE)
+        texts = []
+        # Segments are generated lazily; iterating them runs the actual decoding
+        for segment in segments:
+            texts.append(segment.text.strip())
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"stopped after {segment.end:.0f}s of {info.duration:.0f}s of audio")
+        logger.info(f"Local transcription finished: {info.duration:.0f}s of '{info.language}' audio.")
+        return " ".join(texts)
+
+    async def transcribe(self, audio_file: BinaryIO, filename: str, mimetype: str) -> Optional[str]:
+        if not self.is_available():
+            logger.warning("Cannot transcribe locally: faster-whisper is not installed.")
+            return None
+        try:
+            await self.load()
+            loop = asyncio.get_running_loop()
+            # The thread gets its own copy, so the caller can close the file whenever it's done
+            audio_file.seek(0)
+            audio_bytes = await asyncio.to_thread(audio_file.read)
+            logger.info(f"Transcribing {filename} with local Whisper model...")
+            transcript = await loop.run_in_executor(self._executor, self._transcribe_sync, audio_bytes)
+            logger.info(f"Local transcription successful. Transcript length: {len(transcript)}")
+            return transcript
+        except TimeoutError as e:
+            logger.error(f"Local transcription exceeded {config.LOCAL_TRANSCRIPTION_TIMEOUT_SECONDS} seconds: {e}.")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error during local transcription: {e}", exc_info=True)
+            return None
+
+    async def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._model = None
+
+ENGINES: Dict[str, TranscriptionEngine] = {
+    "openai": OpenAIWhisperEngine(),
+    "local": LocalWhisperEngine(),
+}
+_preload_task: Optional[asyncio.Task] = None
+
+def initialize_transcription_engines():
+    """Logs which engines are usable for the configured TRANSCRIPTION_ENGINE and preloads the local model if needed."""
+    global _preload_task
+    availability = {name: engine.is_available() for name, engine in ENGINES.items()}
+    logger.info(f"Transcription engine: {config.TRANSCRIPTION_ENGINE}. Available engines: {availability}")
+    if config.TRANSCRIPTION_ENGINE in ("local", "auto") and not availability["local"]:
+        logger.warning("Local transcription requested but faster-whisper is not installed. Using the OpenAI API instead.")
+    if config.TRANSCRIPTION_ENGINE in ("local", "auto") and availability["local"]:
+        # Load the model in the background so the first voice note doesn't pay for it
+        _preload_task = asyncio.get_running_loop().create_task(ENGINES["local"].load())
+
+async def close_transcription_engines():
+    """Stops a pending model preload and closes every engine."""
+    if _preload_task and not _preload_task.done():
+        _preload_task.cancel()
+    for engine in ENGINES.values():
+        await engine.close()
+
+def any_engine_available() -> bool:
+    """Returns True if at least one engine can transcribe."""
+    return any(engine.is_available() for engine in ENGINES.values())
+
+def select_engine(audio_file: BinaryIO) -> Optional[TranscriptionEngine]:
+    """
+    Picks the engine for one audio file according to TRANSCRIPTION_ENGINE.
+
+    "openai" and "local" use that engine; "auto" routes clips up to LOCAL_TRANSCRIPTION_MAX_BYTES
+    to the local engine and longer recordings to the API. Falls back to whichever engine is
+    available when the preferred one is not.
+    """
+    if config.TRANSCRIPTION_ENGINE == "auto":
+        preferred = "local" if audio_processing.get_file_size(audio_file) <= config.LOCAL_TRANSCRIPTION_MAX_BYTES else "openai"
+    else:
+        preferred = config.TRANSCRIPTION_ENGINE if config.TRANSCRIPTION_ENGINE in ENGINES else "openai"
+
+    if ENGINES[preferred].is_available():
+        return ENGINES[preferred]
+    fallback = next((engine for engine in ENGINES.values() if engine.is_available()), None)
+    if fallback:
+        logger.info(f"Preferred transcription engine '{preferred}' unavailable. Using '{fallback.name}'.")
+    return fallback
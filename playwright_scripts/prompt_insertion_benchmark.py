@@ -0,0 +1,118 @@
+# prompt_insertion_benchmark.py
+# Times the ways of getting a prompt into a chat composer, for prompt sizes from 1KB to 200KB.
+# Nothing is submitted: the composer is cleared after every measurement.
+# Usage: python playwright_scripts/prompt_insertion_benchmark.py [chatgpt|claude|gemini]
+from playwright.sync_api import sync_playwright, expect, TimeoutError as PlaywrightTimeoutError
+import sys
+import time
+
+SERVICES = {
+    "chatgpt": {"port": 9222, "input": "#prompt-textarea[contenteditable=\"true\"]", "file_input": "input[type=\"file\"]", "submit": "button[data-testid=\"send-button\"]"},
+    "claude": {"port": 9223, "input": ".ProseMirror[contenteditable=\"true\"]", "file_input": "input[type=\"file\"]", "submit": "button[aria-label=\"Send message\"]"},
+    "gemini": {"port": 9224, "input": "div.ql-editor[role=\"textbox\"][aria-label=\"Enter a prompt here\"]", "file_input": None, "submit": "button[aria-label=\"Send message\"]:not([aria-disabled=\"true\"])"},
+}
+SERVICE_NAME = sys.argv[1] if len(sys.argv) > 1 else "chatgpt"
+SERVICE = SERVICES[SERVICE_NAME]
+CONNECTION_URL = f"http://localhost:{SERVICE['port']}"
+PROMPT_SIZES = [1_000, 10_000, 50_000, 100_000, 200_000]
+METHODS = ["fill", "insert_text", "paste", "attach"]
+
+PASTE_SCRIPT = """
+([selector, text]) => {
+  const element = document.querySelector(selector);
+  element.focus();
+  const data = new DataTransfer();
+  data.setData("text/plain", text);
+  element.dispatchEvent(new ClipboardEvent("paste", { clipboardData: data, bubbles: true, cancelable: true }));
+}
+"""
+
+def make_prompt(size):
+    # Transcript-like text with line breaks, so editors create paragraphs as they would in real use
+    line = "This is a line of a long voice note transcript used for benchmarking prompt insertion.\n"
+    return (line * (size // len(line) + 1))[:size]
+
+def clear_composer(page, input_area):
+    input_area.click()
+    page.keyboard.press("ControlOrMeta+a")
+    page.keyboard.press("Delete")
+    expect(input_area).to_have_text("", timeout=10000)
+
+def insert(page, input_area, method, prompt):
+    if method == "fill":
+        input_area.fill(prompt)
+    elif method == "insert_text":
+        input_area.focus()
+        page.keyboard.insert_text(prompt)
+    elif method == "paste":
+        page.evaluate(PASTE_SCRIPT, [SERVICE["input"], prompt])
+    elif method == "attach":
+        page.locator(SERVICE["file_input"]).first.set_input_files(files=[{
+            "name": "prompt.txt",
+            "mimeType": "text/plain",
+            "buffer": prompt.encode("utf-8"),
+        }])
+        input_area.fill("See attached file.")
+        # The upload is done once the send button is usable
+        expect(page.locator(SERVICE["submit"])).to_be_enabled(timeout=60000)
+
+print(f"Attempting to connect to {SERVICE_NAME} browser at {CONNECTION_URL}...")
+
+try:
+    with sync_playwright() as p:
+        try:
+            browser = p.chromium.connect_over_cdp(CONNECTION_URL)
+            context = browser.contexts[0]
+            page = context.pages[0]
+            print("Successfully connected.")
+            print(f"Page URL: {page.url}")
+
+            input_area = page.locator(SERVICE["input"])
+            expect(input_area).to_be_visible(timeout=10000)
+
+            results = []
+            for size in PROMPT_SIZES:
+                prompt = make_prompt(size)
+                for method in METHODS:
+                    if method == "attach" and not SERVICE["file_input"]:
+                        continue
+                    clear_composer(page, input_area)
+                    start_time = time.perf_counter()
+                    try:
+                        insert(page, input_area, method, prompt)
+                        inserted = input_area.evaluate("element => element.innerText.length")
+                        elapsed = time.perf_counter() - start_time
+                        status = "ok" if method == "attach" or inserted >= len(prompt.strip()) * 0.9 else f"only {inserted} chars"
+                    except PlaywrightTimeoutError as e:
+                        elapsed = time.perf_counter() - start_time
+                        status = f"timeout: {str(e).splitlines()[0]}"
+                    except Exception as e:
+                        elapsed = time.perf_counter() - start_time
+                        status = f"error: {e}"
+                    print(f"{size:>8} chars  {method:<12} {elapsed:7.2f}s  {status}")
+                    results.append((size, method, elapsed, status))
+                    if method == "attach":
+                        # Reload to drop the attachment before the next measurement
+                        page.reload(wait_until="domcontentloaded")
+                        expect(input_area).to_be_visible(timeout=15000)
+
+            clear_composer(page, input_area)
+            print("\nSummary (seconds):")
+            print(f"{'size':>8}  " + "  ".join(f"{method:>11}" for method in METHODS))
+            for size in PROMPT_SIZES:
+                row = {method: elapsed for s, method, elapsed, status in results if s == size and status == "ok"}
+                print(f"{size:>8}  " + "  ".join(f"{row[method]:>11.2f}" if method in row else f"{'-':>11}" for method in METHODS))
+
+        except PlaywrightTimeoutError as e:
+            print(f"Timeout Error: {e}")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+        finally:
+            if 'browser' in locals() and browser.is_connected():
+                print("Disconnecting...")
+                browser.close()
+
+except Exception as e:
+    print(f"Failed to initialize Playwright or connect: {e}")
+
+print("Script finished.")